@@ -1,6 +1,6 @@
 from .layoutlm.infer import LayoutLMResult, analyze_bytes_layoutlm
 from .ocr.engine import OcrResult, analyze_bytes
-from .pipeline.analyze import AssistantToolResult, analyze_document_bytes
+from .pipeline.analyze import AssistantToolResult, analyze_document_bytes, analyze_documents_bytes
 from .pipeline.schemas import PipelineResult
 
 __version__ = "0.6.1.dev0"
@@ -12,5 +12,6 @@ __all__ = [
     "analyze_bytes_layoutlm",
     "AssistantToolResult",
     "analyze_document_bytes",
+    "analyze_documents_bytes",
     "PipelineResult",
 ]
@@ -1,11 +1,12 @@
 """IO helpers (loaders and writers)."""
 
 from .loaders import PageImage, load_images_from_bytes
-from .writers import write_csv, write_json, write_jsonl
+from .writers import read_jsonl, write_csv, write_json, write_jsonl
 
 __all__ = [
     "PageImage",
     "load_images_from_bytes",
+    "read_jsonl",
     "write_csv",
     "write_json",
     "write_jsonl",
@@ -4,11 +4,32 @@ from __future__ import annotations
 
 import io
 from dataclasses import dataclass
-from typing import List, Optional
+from pathlib import Path
+from typing import Iterator, List, Optional, Union
 
-from pdf2image import convert_from_bytes
+from pdf2image import convert_from_bytes, convert_from_path, pdfinfo_from_path
 from PIL import Image
 
+# pyspng decodes PNGs through libspng, noticeably faster than Pillow's
+# decoder on large scans; fall back when it is not installed.
+try:
+    import pyspng
+except ImportError:  # pragma: no cover - optional dependency
+    pyspng = None
+
+_PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+def _open_image_bytes(file_bytes: bytes) -> Image.Image:
+    if pyspng is not None and file_bytes[:8] == _PNG_MAGIC:
+        try:
+            return Image.fromarray(pyspng.load(file_bytes))
+        except Exception:
+            # Unsupported PNG variants (e.g. 16-bit palette) fall back to
+            # Pillow rather than failing the load.
+            pass
+    return Image.open(io.BytesIO(file_bytes))
+
 
 @dataclass
 class PageImage:
@@ -44,9 +65,44 @@ def load_images_from_bytes(file_bytes: bytes, *, dpi: int = 300) -> List[PageIma
         return out
 
     # Otherwise, treat as a single image
-    im = Image.open(io.BytesIO(file_bytes))
+    im = _open_image_bytes(file_bytes)
     if im.mode not in ("RGB", "L"):
         im = im.convert("RGB")
     width, height = im.size
     # Return single page image and metadata as PageImage instance
     return [PageImage(page=1, image=im, width=width, height=height)]
+
+
+def iter_images_from_path(path: Union[str, Path], *, dpi: int = 300) -> Iterator[PageImage]:
+    """
+    Yield page images lazily from a PDF or image file on disk.
+
+    PDFs render one page per iteration, so only a single page image is in
+    memory at a time and consumers can start work on page 1 before later
+    pages are rasterized; image files yield one page like
+    load_images_from_bytes.
+
+    :param path: Path to the input PDF or image file.
+    :param dpi: DPI for PDF to image conversion.
+    :return: Iterator of PageImage objects.
+    """
+    path = Path(path)
+    with path.open("rb") as f:
+        head = f.read(4)
+    if head == b"%PDF":
+        n_pages = int(pdfinfo_from_path(str(path))["Pages"])
+        if not n_pages:
+            raise ValueError("Empty PDF")
+        for idx in range(1, n_pages + 1):
+            page = convert_from_path(str(path), dpi=dpi, first_page=idx, last_page=idx)[0]
+            # pdf2image already yields RGB; convert() would copy the page.
+            im = page if page.mode == "RGB" else page.convert("RGB")
+            width, height = im.size
+            yield PageImage(page=idx, image=im, width=width, height=height)
+        return
+
+    im = Image.open(path)
+    if im.mode not in ("RGB", "L"):
+        im = im.convert("RGB")
+    width, height = im.size
+    yield PageImage(page=1, image=im, width=width, height=height)
@@ -0,0 +1,5 @@
+"""Shared helpers for the auto-label scripts."""
+
+from ._bundle import get_bundle
+
+__all__ = ["get_bundle"]
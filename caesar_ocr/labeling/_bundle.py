@@ -0,0 +1,53 @@
+"""Disk-cached matcher bundles for the labeling scripts.
+
+Batch labeling typically launches a fresh interpreter per JSONL file, so
+compiled matcher state (keyword automata, combined patterns) is rebuilt on
+every run. `get_bundle` persists the built object under the user cache
+directory in a `magic + blake2b(fingerprint) + zlib(pickle)` layout and
+reloads it on later runs, rebuilding only when the fingerprint of the
+source definitions changes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import zlib
+from pathlib import Path
+from typing import Any, Callable
+
+_MAGIC = b"COCRB1"
+_DIGEST_SIZE = 16
+
+
+def _cache_dir() -> Path:
+    root = os.environ.get("XDG_CACHE_HOME") or (Path.home() / ".cache")
+    return Path(root) / "caesar_ocr"
+
+
+def get_bundle(name: str, builder: Callable[[], Any], fingerprint: bytes) -> Any:
+    """Return builder(), cached on disk under name and keyed by fingerprint.
+
+    The cache is best-effort: any read, unpickle, or write failure falls
+    back to building (and, where possible, rewriting) the bundle.
+    """
+    digest = hashlib.blake2b(fingerprint, digest_size=_DIGEST_SIZE).digest()
+    path = _cache_dir() / f"bundle-{name}.pkl"
+    try:
+        blob = path.read_bytes()
+        header = len(_MAGIC) + _DIGEST_SIZE
+        if blob[: len(_MAGIC)] == _MAGIC and blob[len(_MAGIC) : header] == digest:
+            return pickle.loads(zlib.decompress(blob[header:]))
+    except Exception:
+        pass
+    bundle = builder()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = _MAGIC + digest + zlib.compress(pickle.dumps(bundle))
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(payload)
+        tmp.replace(path)
+    except Exception:
+        pass
+    return bundle
@@ -6,6 +6,15 @@ import json
 from dataclasses import dataclass
 from typing import Dict, Iterable, List, Optional
 
+# orjson parses a line several times faster than stdlib json; fall back
+# when it is not installed.
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+_loads = orjson.loads if orjson is not None else json.loads
+
 
 @dataclass
 class LayoutLMTokenRecord:
@@ -40,12 +49,13 @@ def iter_jsonl(path) -> Iterable[LayoutLMTokenRecord]:
     :param path: Path to the JSONL file.
     :return: An iterable of LayoutLMTokenRecord objects.
     """
-    # Open the JSONL file and read line by line
-    with open(path, "r", encoding="utf-8") as f:
+    # Read in binary: the decoder takes the raw bytes directly, skipping
+    # the TextIOWrapper decode of every line.
+    with open(path, "rb") as f:
         for line in f:
             if not line.strip():
                 continue
-            data = json.loads(line)
+            data = _loads(line)
             # Yield a LayoutLMTokenRecord instance for each line
             yield LayoutLMTokenRecord(
                 id=data.get("id"),
@@ -60,33 +70,45 @@ def iter_jsonl(path) -> Iterable[LayoutLMTokenRecord]:
             )
 
 
+# Error messages as shared constants: validate_record runs per record
+# over whole datasets, so the strings are built once and appends are
+# pointer copies.
+_ERR_EMPTY_TEXT = "text is empty"
+_ERR_TOKEN_BBOX_MISMATCH = "tokens and bboxes length mismatch"
+_ERR_LABEL_TOKEN_MISMATCH = "labels and tokens length mismatch"
+_ERR_INVALID_BBOX = "invalid bbox entry"
+
+
 def validate_record(rec: LayoutLMTokenRecord) -> List[str]:
     """
     Validate a single LayoutLMTokenRecord and return a list of error messages.
-    
+
     :param rec: LayoutLMTokenRecord to validate.
     :return: List of error messages, empty if no errors.
     """
     errors: List[str] = []
-    # Check for common validation issues
+    # Bind the hot attributes once; every later use is a fast local load.
+    tokens = rec.tokens
+    bboxes = rec.bboxes
+    labels = rec.labels
 
     # rec.text should not be empty. rec is expected to have tokens and bboxes of equal length.
     if not rec.text:
-        errors.append("text is empty")
-    
+        errors.append(_ERR_EMPTY_TEXT)
+
     # tokens and bboxes must be non-empty and of equal length
-    if len(rec.tokens) != len(rec.bboxes):
-        errors.append("tokens and bboxes length mismatch")
+    if len(tokens) != len(bboxes):
+        errors.append(_ERR_TOKEN_BBOX_MISMATCH)
 
     # labels, if present, must match tokens length
-    if rec.labels and len(rec.labels) != len(rec.tokens):
-        errors.append("labels and tokens length mismatch")
+    if labels and len(labels) != len(tokens):
+        errors.append(_ERR_LABEL_TOKEN_MISMATCH)
 
     # Each bbox must be a list of four integers
     # the four integers represent [x0, y0, x1, y1]
-    for box in rec.bboxes:
+    for box in bboxes:
         if not isinstance(box, list) or len(box) != 4:
-            errors.append("invalid bbox entry")
+            errors.append(_ERR_INVALID_BBOX)
             break
     return errors
 
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
-from collections import Counter
 from typing import Dict, Iterable, List
 
+import numpy as np
+
 
 def precision_recall_f1(y_true: Iterable[str], y_pred: Iterable[str], labels: List[str]) -> Dict[str, Dict[str, float]]:
     """
@@ -18,29 +19,30 @@ def precision_recall_f1(y_true: Iterable[str], y_pred: Iterable[str], labels: Li
     :param labels: List of labels to compute metrics for.
     :return: Dictionary mapping each label to its precision, recall, F1-score, and support.
     """
-    # Initialize counters and metrics dictionary
-    metrics: Dict[str, Dict[str, float]] = {}
-    true_counts = Counter(y_true)
-    pred_counts = Counter(y_pred)
-
-    # Calculate precision, recall, and F1-score for each label
-    for label in labels:
-        # True positives, false positives, and false negatives for the current label
-        tp = sum(1 for t, p in zip(y_true, y_pred) if t == label and p == label)
-        fp = pred_counts[label] - tp
-        fn = true_counts[label] - tp
-
-        # Calculate precision, recall, and F1-score for the current label
-        precision = tp / (tp + fp) if (tp + fp) else 0.0
-        recall = tp / (tp + fn) if (tp + fn) else 0.0
-        f1 = (2 * precision * recall / (precision + recall)) if (precision + recall) else 0.0
-        
-        # Store the metrics for the current label
-        metrics[label] = {
-            "precision": precision,
-            "recall": recall,
-            "f1": f1,
-            "support": float(true_counts[label]),   # Number of true instances for this label
+    # Integer-encode once and count every label with three bincounts
+    # instead of re-scanning the sequences per label; anything outside
+    # `labels` maps to a sentinel bucket that is dropped afterwards.
+    index = {label: i for i, label in enumerate(labels)}
+    k = len(labels)
+    t = np.array([index.get(label, k) for label in y_true], dtype=np.int64)
+    p = np.array([index.get(label, k) for label in y_pred], dtype=np.int64)
+
+    n = min(t.size, p.size)
+    matched = t[:n][(t[:n] == p[:n]) & (t[:n] < k)]
+    tp = np.bincount(matched, minlength=k)[:k]
+    fp = np.bincount(p, minlength=k + 1)[:k] - tp
+    fn = np.bincount(t, minlength=k + 1)[:k] - tp
+
+    precision = tp / np.maximum(tp + fp, 1)
+    recall = tp / np.maximum(tp + fn, 1)
+    f1 = 2 * precision * recall / np.maximum(precision + recall, 1e-12)
+
+    return {
+        label: {
+            "precision": float(precision[i]),
+            "recall": float(recall[i]),
+            "f1": float(f1[i]),
+            "support": float(tp[i] + fn[i]),   # Number of true instances for this label
         }
-
-    return metrics
+        for i, label in enumerate(labels)
+    }
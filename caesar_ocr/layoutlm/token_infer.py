@@ -59,7 +59,7 @@ class TokenInferer:
             max_length=max_length,
             return_tensors="pt",
         )
-        with torch.no_grad():
+        with torch.inference_mode():
             logits = self.model(**encoding).logits.squeeze(0)
 
         probs = torch.softmax(logits, dim=-1)
@@ -72,6 +72,61 @@ class TokenInferer:
             except TypeError:
                 word_ids = encoding.word_ids(batch_index=0)
 
+        return self._decode(pred_ids, probs, word_ids, tokens)
+
+    def infer_batch(
+        self,
+        images: List[Image.Image],
+        tokens_list: List[List[str]],
+        bboxes_list: List[List[List[int]]],
+        *,
+        max_length: int = 512,
+    ) -> List[Tuple[List[str], List[float]]]:
+        """Run one forward pass over several pages.
+
+        Batching amortizes the fixed per-call cost (processor dispatch,
+        kernel launches) that infer() pays once per page.
+        """
+        if not images:
+            return []
+        norm_boxes = [
+            [normalize_box(b, image.size[0], image.size[1]) for b in bboxes]
+            for image, bboxes in zip(images, bboxes_list)
+        ]
+        encoding = self.processor(
+            images=images,
+            text=tokens_list,
+            boxes=norm_boxes,
+            truncation=True,
+            padding="max_length",
+            max_length=max_length,
+            return_tensors="pt",
+        )
+        with torch.inference_mode():
+            logits = self.model(**encoding).logits
+
+        probs = torch.softmax(logits, dim=-1)
+        results: List[Tuple[List[str], List[float]]] = []
+        for i, tokens in enumerate(tokens_list):
+            word_ids = None
+            if hasattr(encoding, "word_ids"):
+                try:
+                    word_ids = encoding.word_ids(batch_index=i)
+                except TypeError:
+                    # Some tokenizers expose word_ids without the
+                    # batch_index argument; _decode degrades to the
+                    # positional fallback when alignment is unavailable.
+                    word_ids = None
+            results.append(self._decode(logits[i].argmax(-1).tolist(), probs[i], word_ids, tokens))
+        return results
+
+    def _decode(
+        self,
+        pred_ids: List[int],
+        probs,
+        word_ids: Optional[List[Optional[int]]],
+        tokens: List[str],
+    ) -> Tuple[List[str], List[float]]:
         if word_ids:
             labels = _align_predictions(pred_ids, word_ids, self.id2label)
             score_map: Dict[int, float] = {}
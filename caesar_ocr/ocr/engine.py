@@ -9,10 +9,13 @@ This module provides a single entry point, `analyze_bytes`, which:
 
 #=== Imports =============================================================
 import io
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Sequence
 
+import numpy as np
 from PIL import Image
 
 from .postprocess import preprocess_image, normalize_text, normalize_tokens
@@ -44,16 +47,26 @@ def _ocr_tokens(preprocessed_im, lang: str = "eng+deu", psm: int = 6) -> tuple[s
     return ocr_tokens(preprocessed_im, lang=lang, psm=psm)
 
 
-def detect_mrz_lines(all_predictions: List[str]) -> List[str]:
-    """Return candidate MRZ lines from token-level predictions."""
-    mrz_lines = []
+# Compiled once at import; per-call re.sub/re.compile re-parsed these
+# patterns on every line of every document.
+_MRZ_CLEAN_RE = re.compile(r"[^A-Z0-9<]+")
+_MRZ_LINE2_RE = re.compile(
+    r"[A-Z0-9<]{9}[0-9][A-Z]{3}[0-9]{6}[0-9][MF<][0-9]{6}[0-9][A-Z0-9<]{14}[0-9][0-9]"
+)
+_PASSPORT_NO_FALLBACK_RE = re.compile(
+    r"(passport|passnummer|passport no)\s*[:\-]?\s*([A-Z0-9]{6,})", re.I
+)
+_MRZ_MISREAD_RE = re.compile(r"[CE€]")
+_MRZ_LINE2_EXACT_RE = re.compile(
+    r"^[A-Z0-9<]{9}[0-9][A-Z]{3}[0-9]{6}[0-9][MF<][0-9]{6}[0-9][A-Z0-9<]{14}[0-9][0-9]$"
+)
 
-    # MRZ lines are dense with '<' fillers; 3+ is a cheap signal.
-    for line in all_predictions:
-        if line.count("<") >= 3:
-            mrz_lines.append(line)
 
-    return mrz_lines
+def detect_mrz_lines(all_predictions: List[str]) -> List[str]:
+    """Return candidate MRZ lines from token-level predictions."""
+    # MRZ lines are dense with '<' fillers; str.count is a single C-level
+    # scan, so this stays the only per-line work for non-MRZ text.
+    return [line for line in all_predictions if line.count("<") >= 3]
 
 
 def detect_mrz_lines_from_text(ocr_text: str) -> List[str]:
@@ -64,7 +77,7 @@ def detect_mrz_lines_from_text(ocr_text: str) -> List[str]:
     for line in ocr_text.splitlines():
         if "<" not in line:
             continue
-        cleaned = re.sub(r"[^A-Z0-9<]+", "", line.upper())
+        cleaned = _MRZ_CLEAN_RE.sub("", line.upper())
         if "P<" in cleaned:
             start = cleaned.find("P<")
             if len(cleaned) >= start + 44:
@@ -82,7 +95,7 @@ def detect_mrz_lines_from_text(ocr_text: str) -> List[str]:
     if mrz_lines:
         return mrz_lines
     # Fallback: extract MRZ-like chunks from single-line OCR text.
-    cleaned = re.sub(r"[^A-Z0-9<]+", "", ocr_text.upper())
+    cleaned = _MRZ_CLEAN_RE.sub("", ocr_text.upper())
     if "P<" in cleaned:
         start = cleaned.find("P<")
         if len(cleaned) >= start + 44:
@@ -102,10 +115,7 @@ def detect_mrz_lines_from_text(ocr_text: str) -> List[str]:
 
 def _find_mrz_line2(text: str) -> str | None:
     """Find a TD3 MRZ line 2 candidate inside text."""
-    pattern = re.compile(
-        r"[A-Z0-9<]{9}[0-9][A-Z]{3}[0-9]{6}[0-9][MF<][0-9]{6}[0-9][A-Z0-9<]{14}[0-9][0-9]"
-    )
-    match = pattern.search(text)
+    match = _MRZ_LINE2_RE.search(text)
     if match:
         return match.group(0)
     return None
@@ -128,6 +138,8 @@ FINANCIAL_REPORT_HINTS = {
     "balance",
     "customer",
 }
+# Merged once at import; classify_doc used to rebuild this union per call.
+_DIPLOMA_HINTS = DIPLOMA_HINTS_DE | DIPLOMA_HINTS_EN
 
 #=== Document classification =============================================
 
@@ -139,11 +151,14 @@ def classify_doc(predictions: List[str], *, ocr_text: str | None = None) -> str:
         mrz_lines = detect_mrz_lines(predictions)
     if len(mrz_lines) > 0:
         return "Passport"
-    if any(h in predictions for h in PASSPORT_HINTS):
+    # Hash the tokens once; each hint check is then a set intersection
+    # instead of a full list scan per hint word.
+    pred_set = frozenset(predictions)
+    if not pred_set.isdisjoint(PASSPORT_HINTS):
         return "Passport"
-    if any(h in predictions for h in DIPLOMA_HINTS_DE | DIPLOMA_HINTS_EN):
+    if not pred_set.isdisjoint(_DIPLOMA_HINTS):
         return "Degree Certificate"
-    if any(h in predictions for h in FINANCIAL_REPORT_HINTS):
+    if not pred_set.isdisjoint(FINANCIAL_REPORT_HINTS):
         return "Financial Report"
     return "unknown"
 
@@ -155,6 +170,11 @@ DATE_RE = re.compile(r"(?:(?:19|20)\d{2}[-./](?:0?[1-9]|1[0-2])[-./](?:0?[1-9]|[
 
 # MRZ TD3 parser (2 lines, 44 chars each) – tolerant cleanup
 
+# Precomputed translation tables: one C-level pass replaces the per-field
+# `.replace("<", ...)` chains in the TD3 parser.
+_MRZ_FILLER_TO_SPACE = str.maketrans("<", " ")
+_MRZ_FILLER_DELETE = str.maketrans("", "", "<")
+
 
 def _extract_passport_data_from_mrz(mrz_lines: List[str]) -> Dict[str, Any]:
     """Parse TD3-style MRZ (2 lines) into a minimal field dict."""
@@ -177,10 +197,13 @@ def _extract_passport_data_from_mrz(mrz_lines: List[str]) -> Dict[str, Any]:
             # Extract fields based on fixed positions
             out["document_code"] = l1[0:2]
             out["issuing_country"] = l1[2:5]
-            name_raw = l1[5:].split("<<", 1)
-            out["surname"] = name_raw[0].replace("<", " ").strip()
-            out["given_names"] = name_raw[1].replace("<", " ").strip() if len(name_raw) > 1 else ""
-            out["passport_number"] = l2[0:9].replace("<", "").strip()
+            # Translate fillers once for the whole name area; "<<" becomes a
+            # double space, which still separates surname from given names.
+            name_area = l1[5:].translate(_MRZ_FILLER_TO_SPACE)
+            name_raw = name_area.split("  ", 1)
+            out["surname"] = name_raw[0].strip()
+            out["given_names"] = name_raw[1].strip() if len(name_raw) > 1 else ""
+            out["passport_number"] = l2[0:9].translate(_MRZ_FILLER_DELETE).strip()
             out["nationality"] = l2[10:13]
             out["birth_date_raw"] = l2[13:19]  # YYMMDD
             out["sex"] = l2[20:21]
@@ -195,7 +218,7 @@ def _normalize_mrz_line(line: str, *, numeric: bool = False) -> str:
     """Normalize common OCR mistakes in MRZ lines."""
     line = line.replace(" ", "").upper()
     # Replace common misreads in MRZ fillers
-    line = re.sub(r"[CE€]", "<", line)
+    line = _MRZ_MISREAD_RE.sub("<", line)
     if numeric:
         line = line.replace("O", "0").replace("I", "1").replace("L", "1").replace("S", "5").replace("B", "8").replace("Z", "2")
     # Keep only MRZ-valid characters
@@ -226,7 +249,7 @@ def _is_valid_line2(line: str) -> bool:
         return False
     # Passport number (9), check digit, nationality (3), birth date (6), check digit,
     # sex (1), expiry (6), check digit, personal number (14), check digit, final check (1)
-    if not re.match(r"^[A-Z0-9<]{9}[0-9][A-Z]{3}[0-9]{6}[0-9][MF<][0-9]{6}[0-9][A-Z0-9<]{14}[0-9][0-9]$", line):
+    if not _MRZ_LINE2_EXACT_RE.match(line):
         return False
     return True
 
@@ -246,7 +269,7 @@ def extract_passport_fields(predictions: List[str], *, ocr_text: str | None = No
             recovered_line2 = _coerce_mrz_line2(recovered_line2)
             try:
                 passport_data.setdefault("mrz_line2", recovered_line2)
-                passport_data["passport_number"] = recovered_line2[0:9].replace("<", "").strip()
+                passport_data["passport_number"] = recovered_line2[0:9].translate(_MRZ_FILLER_DELETE).strip()
                 passport_data["nationality"] = recovered_line2[10:13]
                 passport_data["birth_date_raw"] = recovered_line2[13:19]
                 passport_data["sex"] = recovered_line2[20:21]
@@ -256,7 +279,7 @@ def extract_passport_fields(predictions: List[str], *, ocr_text: str | None = No
     ocr_text = text_for_mrz or "\n".join(predictions)
     # Fallback: look for a labeled passport number in body text.
     if "passport_number" not in passport_data:
-        m = re.search(r"(passport|passnummer|passport no)\s*[:\-]?\s*([A-Z0-9]{6,})", ocr_text, re.I)
+        m = _PASSPORT_NO_FALLBACK_RE.search(ocr_text)
         if m:
             passport_data["passport_number"] = m.group(2)
     return passport_data
@@ -331,9 +354,7 @@ def extract_financial_report_fields(ocr_text: str) -> Dict[str, Any]:
         out["accounting_period"] = m.group(2).strip()
 
     # Collect invoice numbers (may appear multiple times).
-    invoice_numbers = []
-    for match in INVOICE_NO_RE.finditer(ocr_text):
-        invoice_numbers.append(match.group(3).strip())
+    invoice_numbers = [m.group(3).strip() for m in INVOICE_NO_RE.finditer(ocr_text)]
     if invoice_numbers:
         out["invoice_numbers"] = sorted(set(invoice_numbers))
 
@@ -342,9 +363,7 @@ def extract_financial_report_fields(ocr_text: str) -> Dict[str, Any]:
     if dates:
         out["dates_detected"] = dates
 
-    amounts = []
-    for match in AMOUNT_RE.finditer(ocr_text):
-        amounts.append(match.group(1))
+    amounts = [m.group(1) for m in AMOUNT_RE.finditer(ocr_text)]
     if amounts:
         out["amounts_detected"] = amounts
 
@@ -472,17 +491,33 @@ def _run_ocr(im: Image.Image, *, lang: str, page: int) -> Dict[str, Any]:
     tokens = normalize_tokens(tokens)
     for token in tokens:
         token["page"] = page
-    predictions = [t["text"].lower() for t in tokens]
+    if tokens:
+        # Vectorized lowering: one C loop instead of a Python call per token.
+        predictions = np.char.lower([t["text"] for t in tokens]).tolist()
+    else:
+        predictions = []
     return {"ocr_text": normalize_text(ocr_text), "tokens": tokens, "predictions": predictions}
 
 
-def analyze_pages(pages: Sequence, *, lang: str = "eng+deu") -> OcrResult:
+def analyze_pages(pages: Sequence, *, lang: str = "eng+deu", max_workers: Optional[int] = None) -> OcrResult:
     all_predictions: List[str] = []
     all_text: List[str] = []
     all_tokens: List[Dict[str, Any]] = []
 
-    for page in pages:
-        result = _run_ocr(page.image, lang=lang, page=page.page)
+    pages = list(pages)
+    if len(pages) > 1:
+        # Pages OCR independently and tesseract/cv2 release the GIL, so
+        # multi-page documents fan out across a thread pool; map keeps
+        # page order. max_workers=1 restores the serial path.
+        workers = max_workers or min(len(pages), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(
+                executor.map(lambda p: _run_ocr(p.image, lang=lang, page=p.page), pages)
+            )
+    else:
+        results = [_run_ocr(page.image, lang=lang, page=page.page) for page in pages]
+
+    for result in results:
         all_predictions.extend(result["predictions"])
         all_text.append(result["ocr_text"])
         all_tokens.extend(result["tokens"])
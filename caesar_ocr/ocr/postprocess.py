@@ -21,8 +21,9 @@ def normalize_tokens(tokens):
         text = str(tok.get("text", "")).strip()
         if not text:
             continue
-        lower = text.lower()
-        if lower in _FUER_VARIANTS:
+        # All misread variants are 3-4 chars; the length gate skips the
+        # lowercase allocation for every other token.
+        if len(text) <= 4 and text.lower() in _FUER_VARIANTS:
             text = "für"
         tok = dict(tok)
         tok["text"] = text
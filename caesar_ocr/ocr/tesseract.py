@@ -2,108 +2,166 @@
 
 from __future__ import annotations
 
-from typing import Dict, List, Tuple
+import os
+import subprocess
+import tempfile
+from typing import Dict, List, Sequence, Tuple
 
 import pytesseract
 
 
-def ocr_tokens(preprocessed_im, *, lang: str = "eng+deu", psm: int = 6) -> Tuple[str, List[Dict[str, object]]]:
-    """Run OCR and return full text plus token dicts with bboxes/confidence."""
+# image_to_data TSV column layout:
+# level page_num block_num par_num line_num word_num left top width height conf text
+_TSV_TEXT_COL = 11
+
+
+def _columns_from_tsv(
+    tsv: str,
+) -> Tuple[List[str], List[List[int]], List[float], List[Tuple[int, int, int, int]], List[int]]:
+    """Parse image_to_data TSV output into parallel columns.
+
+    Splitting the raw TSV ourselves skips pytesseract's Output.DICT path,
+    which builds twelve parallel Python lists per page; empty-text rows are
+    dropped before any int conversion. Columnar output defers token-dict
+    construction until sort order and char offsets are known, so each token
+    allocates exactly one dict. The trailing page-number column lets batch
+    callers split a combined multi-file TSV back into per-file tokens.
+    """
+    texts: List[str] = []
+    bboxes: List[List[int]] = []
+    confs: List[float] = []
+    keys: List[Tuple[int, int, int, int]] = []
+    pages: List[int] = []
+    rows = tsv.split("\n")
+    for row in rows[1:]:
+        cols = row.split("\t")
+        if len(cols) <= _TSV_TEXT_COL:
+            continue
+        text = cols[_TSV_TEXT_COL].strip()
+        if not text:
+            continue
+        left = int(cols[6])
+        top = int(cols[7])
+        texts.append(text)
+        bboxes.append([left, top, left + int(cols[8]), top + int(cols[9])])
+        confs.append(float(cols[10]))
+        keys.append((int(cols[2]), int(cols[3]), int(cols[4]), int(cols[5])))
+        pages.append(int(cols[1]))
+    return texts, bboxes, confs, keys, pages
+
+
+def _tokens_with_text(image, *, lang: str, psm: int) -> Tuple[str, List[Dict[str, object]]]:
+    """Run image_to_data, order tokens, and attach char offsets."""
     cfg = f"--oem 3 --psm {psm}"
-    data = pytesseract.image_to_data(
-        preprocessed_im, lang=lang, config=cfg, output_type=pytesseract.Output.DICT
+    tsv = pytesseract.image_to_data(
+        image, lang=lang, config=cfg, output_type=pytesseract.Output.STRING
     )
+    texts, bboxes, confs, keys, _pages = _columns_from_tsv(tsv)
+    return _assemble_tokens(texts, bboxes, confs, keys)
 
-    tokens: List[Dict[str, object]] = []
-    n = len(data.get("text", []))
-    for i in range(n):
-        text = (data["text"][i] or "").strip()
-        if not text:
-            continue
-        left = int(data["left"][i])
-        top = int(data["top"][i])
-        width = int(data["width"][i])
-        height = int(data["height"][i])
-        conf = float(data.get("conf", [])[i]) if data.get("conf") is not None else None
-        tokens.append(
-            {
-                "text": text,
-                "bbox": [left, top, left + width, top + height],
-                "conf": conf,
-                "block_num": int(data.get("block_num", [0])[i]),
-                "par_num": int(data.get("par_num", [0])[i]),
-                "line_num": int(data.get("line_num", [0])[i]),
-                "word_num": int(data.get("word_num", [0])[i]),
-            }
-        )
 
-    tokens.sort(key=lambda t: (t["block_num"], t["par_num"], t["line_num"], t["word_num"]))
+def _assemble_tokens(
+    texts: List[str],
+    bboxes: List[List[int]],
+    confs: List[float],
+    keys: List[Tuple[int, int, int, int]],
+) -> Tuple[str, List[Dict[str, object]]]:
+    """Order token columns and build token dicts with char offsets."""
+    order = sorted(range(len(texts)), key=keys.__getitem__)
 
-    text_parts = []
+    tokens: List[Dict[str, object]] = []
+    text_parts: List[str] = []
     cursor = 0
-    for token in tokens:
+    for i in order:
         if text_parts:
             text_parts.append(" ")
             cursor += 1
+        text = texts[i]
         start = cursor
-        text_parts.append(token["text"])
-        cursor += len(token["text"])
-        end = cursor
-        token["start"] = start
-        token["end"] = end
-
-    full_text = "".join(text_parts)
-    return full_text, tokens
-
-
-def ocr_tokens_from_image(image, *, lang: str = "eng+deu", psm: int = 6) -> Tuple[str, List[Dict[str, object]]]:
-    """Run OCR on a PIL image and return text plus token dicts."""
-    cfg = f"--oem 3 --psm {psm}"
-    data = pytesseract.image_to_data(
-        image, lang=lang, config=cfg, output_type=pytesseract.Output.DICT
-    )
-    tokens: List[Dict[str, object]] = []
-    n = len(data.get("text", []))
-    for i in range(n):
-        text = (data["text"][i] or "").strip()
-        if not text:
-            continue
-        left = int(data["left"][i])
-        top = int(data["top"][i])
-        width = int(data["width"][i])
-        height = int(data["height"][i])
-        conf = float(data.get("conf", [])[i]) if data.get("conf") is not None else None
+        cursor += len(text)
+        text_parts.append(text)
+        key = keys[i]
         tokens.append(
             {
                 "text": text,
-                "bbox": [left, top, left + width, top + height],
-                "conf": conf,
-                "block_num": int(data.get("block_num", [0])[i]),
-                "par_num": int(data.get("par_num", [0])[i]),
-                "line_num": int(data.get("line_num", [0])[i]),
-                "word_num": int(data.get("word_num", [0])[i]),
+                "bbox": bboxes[i],
+                "conf": confs[i],
+                "block_num": key[0],
+                "par_num": key[1],
+                "line_num": key[2],
+                "word_num": key[3],
+                "start": start,
+                "end": cursor,
             }
         )
 
-    tokens.sort(key=lambda t: (t["block_num"], t["par_num"], t["line_num"], t["word_num"]))
-
-    text_parts = []
-    cursor = 0
-    for token in tokens:
-        if text_parts:
-            text_parts.append(" ")
-            cursor += 1
-        start = cursor
-        text_parts.append(token["text"])
-        cursor += len(token["text"])
-        end = cursor
-        token["start"] = start
-        token["end"] = end
-
     full_text = "".join(text_parts)
     return full_text, tokens
 
 
+def ocr_tokens(preprocessed_im, *, lang: str = "eng+deu", psm: int = 6) -> Tuple[str, List[Dict[str, object]]]:
+    """Run OCR and return full text plus token dicts with bboxes/confidence."""
+    return _tokens_with_text(preprocessed_im, lang=lang, psm=psm)
+
+
+def ocr_tokens_from_image(image, *, lang: str = "eng+deu", psm: int = 6) -> Tuple[str, List[Dict[str, object]]]:
+    """Run OCR on a PIL image and return text plus token dicts."""
+    return _tokens_with_text(image, lang=lang, psm=psm)
+
+
+def ocr_tokens_batch(
+    paths: Sequence[str], *, lang: str = "eng+deu", psm: int = 6
+) -> List[Tuple[str, List[Dict[str, object]]]]:
+    """Run one Tesseract invocation over a list of image files.
+
+    A single process amortizes engine startup and model load across the
+    whole batch, and Leptonica reads each file straight from disk instead
+    of round-tripping pixels through PIL. Tesseract numbers each listed
+    file as a page in the combined TSV; the output is split back into
+    per-file results here.
+
+    :param paths: Image file paths, OCRed in order.
+    :param lang: Tesseract language(s).
+    :param psm: Tesseract page segmentation mode.
+    :return: One (full_text, tokens) tuple per input path, in input order.
+    """
+    if not paths:
+        return []
+    list_fd, list_path = tempfile.mkstemp(suffix=".txt", text=True)
+    try:
+        with os.fdopen(list_fd, "w", encoding="utf-8") as list_f:
+            list_f.write("\n".join(paths) + "\n")
+        cmd = [
+            pytesseract.pytesseract.tesseract_cmd,
+            list_path,
+            "stdout",
+            "-l",
+            lang,
+            "--oem",
+            "3",
+            "--psm",
+            str(psm),
+            "tsv",
+        ]
+        proc = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    finally:
+        os.unlink(list_path)
+    texts, bboxes, confs, keys, pages = _columns_from_tsv(proc.stdout)
+
+    results: List[Tuple[str, List[Dict[str, object]]]] = []
+    for page in range(1, len(paths) + 1):
+        idxs = [i for i, p in enumerate(pages) if p == page]
+        results.append(
+            _assemble_tokens(
+                [texts[i] for i in idxs],
+                [bboxes[i] for i in idxs],
+                [confs[i] for i in idxs],
+                [keys[i] for i in idxs],
+            )
+        )
+    return results
+
+
 def ocr_predictions(preprocessed_im, *, lang: str = "eng+deu", psm: int = 11) -> List[str]:
     """Run word-level OCR and return a list of tokens (lowercased)."""
     full_text, tokens = ocr_tokens(preprocessed_im, lang=lang, psm=psm)
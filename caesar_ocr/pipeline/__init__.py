@@ -1,5 +1,5 @@
 """Pipeline package (end-to-end analysis)."""
 
-from .analyze import AssistantToolResult, analyze_document_bytes
+from .analyze import AssistantToolResult, analyze_document_bytes, analyze_documents_bytes
 
-__all__ = ["AssistantToolResult", "analyze_document_bytes"]
+__all__ = ["AssistantToolResult", "analyze_document_bytes", "analyze_documents_bytes"]
@@ -1,5 +1,7 @@
 """Combined OCR + LayoutLM tool entry point."""
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import List, Optional, Sequence
@@ -20,6 +22,10 @@ def _postprocess_position_labels(
 ) -> tuple[List[str], List[float]]:
     if not labels:
         return labels, scores
+    # One C-level membership scan skips the per-token pass (and the list
+    # copies) entirely for pages without position labels — most of them.
+    if "B-POSITION_NR" not in labels:
+        return labels, scores
     out_labels = list(labels)
     out_scores = list(scores) if scores else []
 
@@ -85,11 +91,15 @@ def analyze_document_pages(
     layoutlm_model_dir: Optional[str] = None,
     layoutlm_lang: Optional[str] = None,
     layoutlm_token_model_dir: Optional[str] = None,
+    layoutlm_result: Optional[LayoutLMResult] = None,
 ) -> AssistantToolResult:
-    """Build a full pipeline result from precomputed OCR pages/results."""
+    """Build a full pipeline result from precomputed OCR pages/results.
+
+    A caller that has already run the LayoutLM classifier (possibly
+    concurrently with OCR) can pass layoutlm_result to skip the call here.
+    """
     page_items = []
-    layoutlm_result = None
-    if layoutlm_model_dir and file_bytes:
+    if layoutlm_result is None and layoutlm_model_dir and file_bytes:
         layoutlm_result = analyze_bytes_layoutlm(
             file_bytes,
             model_dir=layoutlm_model_dir,
@@ -97,17 +107,45 @@ def analyze_document_pages(
         )
     layout = None
     layoutlm_tokens = None
+
+    # Bucket tokens by page once instead of rescanning the full token list
+    # for every page (O(pages * tokens) otherwise).
+    tokens_by_page: dict[int, List[dict]] = {}
+    unpaged_tokens: List[dict] = []
+    for t in ocr_result.tokens:
+        page_no = t.get("page")
+        if page_no is None:
+            unpaged_tokens.append(t)
+        else:
+            tokens_by_page.setdefault(page_no, []).append(t)
+
+    def _page_tokens(page_no: int) -> List[dict]:
+        if not unpaged_tokens:
+            return tokens_by_page.get(page_no, [])
+        if not tokens_by_page:
+            return unpaged_tokens
+        # Mixed paged/pageless tokens: keep the order-preserving filter.
+        return [t for t in ocr_result.tokens if t.get("page", page_no) == page_no]
+
     token_labels_by_page: dict[int, List[str]] = {}
     token_scores_by_page: dict[int, List[float]] = {}
     if layoutlm_token_model_dir and pages:
         all_labels: List[str] = []
         all_scores: List[float] = []
         inferer = TokenInferer.from_model_dir(layoutlm_token_model_dir)
-        for page in pages:
-            page_tokens = [t for t in ocr_result.tokens if t.get("page", page.page) == page.page]
-            token_texts = [t.get("text", "") for t in page_tokens]
-            token_boxes = [t.get("bbox") or [0, 0, 0, 0] for t in page_tokens]
-            labels, scores = inferer.infer(page.image, token_texts, token_boxes)
+        # All token-bearing pages go through one forward pass; pages
+        # without tokens contribute nothing and are skipped outright.
+        to_infer = [
+            (page, page_tokens)
+            for page in pages
+            if (page_tokens := _page_tokens(page.page))
+        ]
+        predictions = inferer.infer_batch(
+            [page.image for page, _ in to_infer],
+            [[t.get("text", "") for t in toks] for _, toks in to_infer],
+            [[t.get("bbox") or [0, 0, 0, 0] for t in toks] for _, toks in to_infer],
+        )
+        for (page, _), (labels, scores) in zip(to_infer, predictions):
             token_labels_by_page[page.page] = labels
             if scores:
                 token_scores_by_page[page.page] = scores
@@ -117,7 +155,7 @@ def analyze_document_pages(
 
     if pages:
         for idx, page in enumerate(pages):
-            page_tokens = [t for t in ocr_result.tokens if t.get("page", page.page) == page.page]
+            page_tokens = _page_tokens(page.page)
             labels = token_labels_by_page.get(page.page, [])
             scores = token_scores_by_page.get(page.page, [])
             labels, scores = _postprocess_position_labels(page_tokens, labels, scores)
@@ -172,8 +210,24 @@ def analyze_document_bytes(
     layoutlm_token_model_dir: Optional[str] = None,
 ) -> AssistantToolResult:
     """Analyze bytes with OCR and optional LayoutLM classifier."""
-    pages = load_images_from_bytes(file_bytes, dpi=300)
-    ocr_result = analyze_pages(pages, lang=lang)
+    layoutlm_result = None
+    if layoutlm_model_dir:
+        # The document classifier only needs the raw bytes, so it runs
+        # alongside OCR; tesseract, torch and pdf rasterization all release
+        # the GIL, letting the two heavy stages overlap.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            layout_future = executor.submit(
+                analyze_bytes_layoutlm,
+                file_bytes,
+                model_dir=layoutlm_model_dir,
+                lang=layoutlm_lang,
+            )
+            pages = load_images_from_bytes(file_bytes, dpi=300)
+            ocr_result = analyze_pages(pages, lang=lang)
+            layoutlm_result = layout_future.result()
+    else:
+        pages = load_images_from_bytes(file_bytes, dpi=300)
+        ocr_result = analyze_pages(pages, lang=lang)
     if regex_rules_path:
         rules = load_rules(Path(regex_rules_path))
         regex_fields = run_rules(ocr_result.ocr_text, rules, debug=regex_debug)
@@ -192,6 +246,48 @@ def analyze_document_bytes(
         layoutlm_model_dir=layoutlm_model_dir,
         layoutlm_lang=layoutlm_lang,
         layoutlm_token_model_dir=layoutlm_token_model_dir,
+        layoutlm_result=layoutlm_result,
     )
     result.schema.ocr.language = lang
     return result
+
+
+def analyze_documents_bytes(
+    files: Sequence[bytes],
+    layoutlm_model_dir: Optional[str] = None,
+    *,
+    lang: str = "eng+deu",
+    layoutlm_lang: Optional[str] = None,
+    regex_rules_path: Optional[str] = None,
+    regex_debug: bool = False,
+    layoutlm_token_model_dir: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> List[AssistantToolResult]:
+    """Analyze several documents, amortizing warm state across them.
+
+    Model loads are cached per process and regex rules per file stat, so
+    only the first document pays initialization. Documents run on a bounded
+    thread pool — the heavy stages (tesseract, torch, pdf rasterization)
+    release the GIL — and results come back in input order.
+    """
+    if layoutlm_token_model_dir:
+        # Warm the cache once instead of racing the first load from N threads.
+        TokenInferer.from_model_dir(layoutlm_token_model_dir)
+
+    def _analyze(file_bytes: bytes) -> AssistantToolResult:
+        return analyze_document_bytes(
+            file_bytes,
+            layoutlm_model_dir,
+            lang=lang,
+            layoutlm_lang=layoutlm_lang,
+            regex_rules_path=regex_rules_path,
+            regex_debug=regex_debug,
+            layoutlm_token_model_dir=layoutlm_token_model_dir,
+        )
+
+    files = list(files)
+    if len(files) <= 1:
+        return [_analyze(f) for f in files]
+    workers = max_workers or min(len(files), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_analyze, files))
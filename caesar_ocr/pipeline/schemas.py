@@ -2,11 +2,20 @@
 
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass, field
+import functools
+import sys
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
+if sys.version_info >= (3, 10):
+    # Slotted instances drop the per-object __dict__, roughly halving the
+    # footprint of the tens of thousands of OcrToken objects a scan yields.
+    _dataclass = functools.partial(dataclass, slots=True)
+else:  # pragma: no cover - pre-3.10 fallback
+    _dataclass = dataclass
 
-@dataclass
+
+@_dataclass
 class OcrToken:
     text: str
     bbox: List[int]
@@ -16,8 +25,19 @@ class OcrToken:
     label: Optional[str] = None
     label_score: Optional[float] = None
 
+    def to_dict(self) -> dict:
+        return {
+            "text": self.text,
+            "bbox": self.bbox,
+            "start": self.start,
+            "end": self.end,
+            "conf": self.conf,
+            "label": self.label,
+            "label_score": self.label_score,
+        }
+
 
-@dataclass
+@_dataclass
 class OcrPage:
     page: int
     width: int
@@ -25,8 +45,17 @@ class OcrPage:
     text: str
     tokens: List[OcrToken] = field(default_factory=list)
 
+    def to_dict(self) -> dict:
+        return {
+            "page": self.page,
+            "width": self.width,
+            "height": self.height,
+            "text": self.text,
+            "tokens": [t.to_dict() for t in self.tokens],
+        }
+
 
-@dataclass
+@_dataclass
 class OcrDocument:
     doc_id: Optional[str]
     doc_type: str
@@ -34,24 +63,48 @@ class OcrDocument:
     pages: List[OcrPage] = field(default_factory=list)
     fields: Dict[str, object] = field(default_factory=dict)
 
+    def to_dict(self) -> dict:
+        return {
+            "doc_id": self.doc_id,
+            "doc_type": self.doc_type,
+            "language": self.language,
+            "pages": [p.to_dict() for p in self.pages],
+            "fields": self.fields,
+        }
 
-@dataclass
+
+@_dataclass
 class LayoutLMClassification:
     label: str
     scores: Dict[str, float]
 
+    def to_dict(self) -> dict:
+        return {"label": self.label, "scores": self.scores}
+
 
-@dataclass
+@_dataclass
 class LayoutLMTokenClassification:
     labels: List[str]
     scores: Optional[List[float]] = None
 
+    def to_dict(self) -> dict:
+        return {"labels": self.labels, "scores": self.scores}
+
 
-@dataclass
+@_dataclass
 class PipelineResult:
     ocr: OcrDocument
     layoutlm: Optional[LayoutLMClassification] = None
     layoutlm_tokens: Optional[LayoutLMTokenClassification] = None
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        # Hand-built dicts avoid dataclasses.asdict's recursive deepcopy of
+        # every token and bbox, which dominates serialization on large OCR
+        # outputs. Nested lists/dicts are shared, not copied.
+        return {
+            "ocr": self.ocr.to_dict(),
+            "layoutlm": self.layoutlm.to_dict() if self.layoutlm is not None else None,
+            "layoutlm_tokens": (
+                self.layoutlm_tokens.to_dict() if self.layoutlm_tokens is not None else None
+            ),
+        }
@@ -0,0 +1,46 @@
+"""Regex backend selection for rule compilation.
+
+Prefers `re2` (linear-time DFA, no catastrophic backtracking) when it is
+installed, then the third-party `regex` module (faster alternations), and
+always falls back to the stdlib `re`. Both alternatives mimic the stdlib
+module API, so compiled patterns are drop-in. re2 rejects features such as
+backreferences at compile time; rules that need them can pin the stdlib
+engine with `backend: re` in the YAML.
+"""
+
+from __future__ import annotations
+
+import re as _re
+from typing import Optional
+
+try:
+    import re2 as _re2  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    _re2 = None
+
+try:
+    import regex as _regex  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    _regex = None
+
+
+def compile(pattern: str, flags: int = 0, *, backend: Optional[str] = None):
+    """Compile pattern with the fastest available backend.
+
+    A malformed pattern always raises the stdlib `re.error`, so callers can
+    keep a single except clause regardless of which backend is active.
+    """
+    if backend == "re":
+        return _re.compile(pattern, flags)
+    if _re2 is not None:
+        try:
+            return _re2.compile(pattern, flags)
+        except Exception:
+            # Unsupported feature (e.g. backreference, lookaround): fall through.
+            pass
+    if _regex is not None:
+        try:
+            return _regex.compile(pattern, flags)
+        except Exception:
+            pass
+    return _re.compile(pattern, flags)
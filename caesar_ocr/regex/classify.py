@@ -3,7 +3,12 @@
 from __future__ import annotations
 
 import re
-from typing import Dict, Iterable, List, Set
+from typing import Dict, List, Set
+
+try:
+    import ahocorasick  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    ahocorasick = None
 
 
 CANONICAL_DOCS: Dict[str, List[str]] = {
@@ -22,14 +27,68 @@ CANONICAL_DOCS: Dict[str, List[str]] = {
 }
 
 
+# Fallback path: one combined alternation (longest keyword first, so
+# "b2 pflege" wins over "b2" at the same position) scanned in a single pass.
+_KW_TO_CANON: Dict[str, str] = {
+    kw: canon for canon, keywords in CANONICAL_DOCS.items() for kw in keywords
+}
+_BIG_RE = re.compile(
+    r"\b(" + "|".join(sorted(map(re.escape, _KW_TO_CANON), key=len, reverse=True)) + r")\b"
+)
+# Keywords nested inside longer ones at word boundaries ("b2" in "b2 pflege"):
+# a longer match consumes the span, so nested hits are credited explicitly.
+_NESTED: Dict[str, tuple] = {}
+for _kw in _KW_TO_CANON:
+    _inner = tuple(
+        other
+        for other in _KW_TO_CANON
+        if other != _kw and len(other) < len(_kw) and re.search(rf"\b{re.escape(other)}\b", _kw)
+    )
+    if _inner:
+        _NESTED[_kw] = _inner
+del _kw, _inner
+
+
+def _build_automaton():
+    """Build one Aho-Corasick automaton over all keywords, or None."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for canon, keywords in CANONICAL_DOCS.items():
+        for kw in keywords:
+            automaton.add_word(kw, (canon, kw))
+    automaton.make_automaton()
+    return automaton
+
+
+_AUTOMATON = _build_automaton()
+
+
+def _is_word_boundary(text: str, start: int, end: int) -> bool:
+    """Check that text[start:end] is not embedded in a longer word."""
+    if start > 0 and (text[start - 1].isalnum() or text[start - 1] == "_"):
+        return False
+    if end < len(text) and (text[end].isalnum() or text[end] == "_"):
+        return False
+    return True
+
+
 def infer_present_docs(text: str) -> Set[str]:
     """Infer which canonical document types are present based on OCR text."""
-    present = set()
+    present: Set[str] = set()
     lower_text = text.lower()
-    for canon, keywords in CANONICAL_DOCS.items():
-        for kw in keywords:
-            if re.search(rf"\\b{re.escape(kw)}\\b", lower_text):
+    if _AUTOMATON is not None:
+        # One linear pass over the text instead of one regex scan per keyword.
+        for end_idx, (canon, kw) in _AUTOMATON.iter(lower_text):
+            if canon in present:
+                continue
+            start = end_idx - len(kw) + 1
+            if _is_word_boundary(lower_text, start, end_idx + 1):
                 present.add(canon)
-                break
+        return present
+    for m in _BIG_RE.finditer(lower_text):
+        kw = m.group(1)
+        present.add(_KW_TO_CANON[kw])
+        for inner in _NESTED.get(kw, ()):
+            present.add(_KW_TO_CANON[inner])
     return present
-
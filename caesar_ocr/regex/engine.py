@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import functools
+import logging
 import re
 from dataclasses import dataclass
 from pathlib import Path
@@ -9,6 +11,15 @@ from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - libyaml not available
+    from yaml import SafeLoader as _YamlLoader
+
+from . import _backend
+
+
+LOGGER = logging.getLogger("caesar_ocr.regex")
 
 ValidatorFn = Callable[[str, Dict[str, Any]], bool]
 PluginFn = Callable[[str, Dict[str, Any]], Dict[str, Any]]
@@ -24,6 +35,14 @@ class RegexRule:
     flags: Optional[str] = None
     plugin: Optional[str] = None
     validators: Optional[List[str]] = None
+    # Higher-priority rules run first; with several alternative patterns for
+    # the same output_field, the preferred one should carry the higher value.
+    priority: int = 0
+    # "re" pins the stdlib engine for patterns re2 cannot represent.
+    backend: Optional[str] = None
+    # Compiled once at load time so run_rules never pays pattern-compile
+    # overhead (or re-cache churn) per document.
+    _compiled: Optional[Any] = None
 
 
 @dataclass
@@ -52,25 +71,158 @@ def _parse_flags(flag_str: Optional[str]) -> int:
     return flags
 
 
+# Inline-group letters for each flag _parse_flags honors, so the combined
+# alternation can embed exactly the flags the per-rule compiles apply.
+_INLINE_FLAG_LETTERS = (
+    (re.ASCII, "a"),
+    (re.IGNORECASE, "i"),
+    (re.MULTILINE, "m"),
+    (re.DOTALL, "s"),
+    (re.VERBOSE, "x"),
+)
+
+
 def load_rules(path: Path) -> List[RegexRule]:
-    data = yaml.safe_load(path.read_text()) or []
+    """Load rules from YAML, memoized until the file changes on disk.
+
+    Long-running workers call this per document; the stat-keyed cache makes
+    repeat loads free while still picking up edited rule files.
+    """
+    path = Path(path)
+    try:
+        stat = path.stat()
+    except OSError:
+        # Let the uncached path raise the usual error for missing files.
+        return _load_rules_uncached(path)
+    return _load_rules_cached(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=32)
+def _load_rules_cached(path_str: str, mtime_ns: int, size: int) -> List[RegexRule]:
+    return _load_rules_uncached(Path(path_str))
+
+
+def _load_rules_uncached(path: Path) -> List[RegexRule]:
+    data = yaml.load(path.read_text(), Loader=_YamlLoader) or []
     rules: List[RegexRule] = []
     for item in data:
-        rules.append(
-            RegexRule(
-                name=item.get("name"),
-                pattern=item.get("pattern", ""),
-                group=int(item.get("group", 0)),
-                output_field=item.get("output_field"),
-                confidence=item.get("confidence"),
-                flags=item.get("flags"),
-                plugin=item.get("plugin"),
-                validators=item.get("validators"),
-            )
+        rule = RegexRule(
+            name=item.get("name"),
+            pattern=item.get("pattern", ""),
+            group=int(item.get("group", 0)),
+            output_field=item.get("output_field"),
+            confidence=item.get("confidence"),
+            flags=item.get("flags"),
+            plugin=item.get("plugin"),
+            validators=item.get("validators"),
+            priority=int(item.get("priority", 0)),
+            backend=item.get("backend"),
         )
+        if rule.pattern:
+            try:
+                rule._compiled = _backend.compile(
+                    rule.pattern, _parse_flags(rule.flags), backend=rule.backend
+                )
+            except re.error as exc:
+                LOGGER.warning("Skipping rule %r with malformed pattern: %s", rule.name, exc)
+                continue
+        rules.append(rule)
     return rules
 
 
+class MultiRuleMatcher:
+    """Single-pass scanner over the combinable pattern rules.
+
+    Wraps each eligible rule (pattern-only, ``group == 0``, no named groups or
+    backreferences) in a named alternation branch so one ``finditer`` pass over
+    the text resolves first matches for all of them at once, instead of one
+    full-text scan per rule. Rules the combined pattern cannot represent are
+    left to the per-rule path. Because alternation consumes matched spans, a
+    branch can be shadowed by an earlier overlapping match — both dropping its
+    first occurrence and reporting a later one instead. Only the branch owning
+    the overall first match is guaranteed unshadowed; callers must treat every
+    other combined-pass hit as a presence signal and re-search those rules
+    individually.
+    """
+
+    def __init__(self, rules: List[RegexRule]):
+        self.combined: Optional[re.Pattern] = None
+        self._alias_to_index: Dict[str, int] = {}
+        branches = []
+        for idx, rule in enumerate(rules):
+            branch = self._branch_for(rule)
+            if branch is None:
+                continue
+            alias = f"_r{idx}"
+            branches.append(f"(?P<{alias}>{branch})")
+            self._alias_to_index[alias] = idx
+        if len(self._alias_to_index) > 1:
+            try:
+                self.combined = re.compile("|".join(branches))
+            except re.error:
+                self.combined = None
+                self._alias_to_index = {}
+
+    @staticmethod
+    def _branch_for(rule: RegexRule) -> Optional[str]:
+        if rule.plugin or not rule.pattern or rule.group != 0:
+            return None
+        pattern = rule.pattern
+        # Named groups and backreferences do not survive group renumbering.
+        if "(?P<" in pattern or "(?P=" in pattern or re.search(r"\\\d", pattern):
+            return None
+        # Hoist leading global inline flags into scoped form; Python rejects
+        # global flag groups that are not at the start of the whole pattern.
+        flag_letters = ""
+        m = re.match(r"\(\?([aimsx]+)\)", pattern)
+        if m:
+            flag_letters = m.group(1)
+            pattern = pattern[m.end() :]
+        # Embed exactly the flags _parse_flags yields for this rule, so the
+        # branch matches identically to the precompiled per-rule pattern and
+        # the lazy re-search compile.
+        parsed = _parse_flags(rule.flags)
+        for flag, ch in _INLINE_FLAG_LETTERS:
+            if parsed & flag and ch not in flag_letters:
+                flag_letters += ch
+        if flag_letters:
+            return f"(?{flag_letters}:{pattern})"
+        return f"(?:{pattern})"
+
+    def covers(self, index: int) -> bool:
+        return self.combined is not None and f"_r{index}" in self._alias_to_index
+
+    def first_matches(self, text: str) -> Dict[int, re.Match]:
+        """Return first match per covered rule index from one pass over text."""
+        out: Dict[int, re.Match] = {}
+        if self.combined is None:
+            return out
+        remaining = len(self._alias_to_index)
+        for match in self.combined.finditer(text):
+            alias = match.lastgroup
+            if alias is None:
+                continue
+            index = self._alias_to_index[alias]
+            if index in out:
+                continue
+            out[index] = match
+            if len(out) == remaining:
+                break
+        return out
+
+
+_MATCHER_CACHE: Dict[Tuple, MultiRuleMatcher] = {}
+
+
+def _matcher_for(rules: List[RegexRule]) -> MultiRuleMatcher:
+    key = tuple((r.name, r.pattern, r.flags, r.group, bool(r.plugin)) for r in rules)
+    matcher = _MATCHER_CACHE.get(key)
+    if matcher is None:
+        matcher = MultiRuleMatcher(rules)
+        _MATCHER_CACHE[key] = matcher
+    return matcher
+
+
 def _run_validators(
     value: str,
     validators: Optional[List[str]],
@@ -98,6 +250,11 @@ def run_rules(
 ) -> Dict[str, Any]:
     """Run regex rules over text and return extracted fields.
 
+    Rules run in priority order (higher first, stable within equal priority)
+    and the loop stops early once every output field has a value and no
+    plugin rules remain; once a field is captured, lower-priority
+    alternative patterns for it are skipped without scanning.
+
     If debug is True, includes a "__debug__" list with match details.
     """
     results: Dict[str, Any] = {}
@@ -110,8 +267,26 @@ def run_rules(
 
     ctx: Dict[str, Any] = {"results": results, "text": text}
 
-    for rule in rules:
+    rules = sorted(rules, key=lambda r: -r.priority)
+    matcher = _matcher_for(rules)
+    prematched = matcher.first_matches(text)
+    # Alternation consumes matched spans, so a branch's combined-pass hit can
+    # be a later occurrence than its true first match when an earlier
+    # overlapping span went to another rule. The branch owning the overall
+    # first match cannot have been shadowed; every other hit only proves the
+    # rule matches somewhere and is re-searched individually below.
+    authoritative = (
+        min(prematched, key=lambda i: prematched[i].start()) if prematched else None
+    )
+
+    pending = {r.output_field or r.name for r in rules if r.pattern and not r.plugin}
+    plugins_left = sum(1 for r in rules if r.plugin)
+
+    for index, rule in enumerate(rules):
+        if not pending and not plugins_left:
+            break
         if rule.plugin:
+            plugins_left -= 1
             plugin = plugins.get(rule.plugin)
             if plugin:
                 plugin_out = plugin(text, results)
@@ -121,12 +296,29 @@ def run_rules(
             continue
         if not rule.pattern:
             continue
-        flags = _parse_flags(rule.flags)
-        match = re.search(rule.pattern, text, flags=flags)
+        field = rule.output_field or rule.name
+        if field not in pending:
+            # A higher-priority alternative already captured this field.
+            continue
+        match = prematched.get(index)
+        if match is None and matcher.covers(index) and not prematched:
+            # Zero hits in the combined pass means no branch matches anywhere.
+            continue
+        if match is not None and index != authoritative:
+            # The hit may be shadowed to a later occurrence; re-search.
+            match = None
+        if match is None:
+            # Either the rule is not combinable, or an overlapping branch may
+            # have shadowed it in the combined pass; search it individually.
+            # Rules from load_rules carry a precompiled pattern; compile
+            # lazily for rules constructed by hand.
+            compiled = rule._compiled
+            if compiled is None:
+                compiled = re.compile(rule.pattern, _parse_flags(rule.flags))
+            match = compiled.search(text)
         if not match:
             continue
         value = match.group(rule.group)
-        field = rule.output_field or rule.name
         if not _run_validators(value, rule.validators, validators, ctx):
             if debug:
                 debug_rows.append({"rule": rule.name, "field": field, "value": value, "valid": False})
@@ -135,6 +327,7 @@ def run_rules(
         if rule.confidence is not None:
             results[f"{field}_confidence"] = rule.confidence
         results[field] = value
+        pending.discard(field)
         if debug:
             debug_rows.append(
                 {
@@ -3,14 +3,51 @@
 from __future__ import annotations
 
 import argparse
+import bisect
+import itertools
 import json
+import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterable, Iterator, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from caesar_ocr.labeling import get_bundle
+
+try:
+    import ahocorasick  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    ahocorasick = None
+
+
+# JSONL codec: orjson when available, stdlib json otherwise.
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+if orjson is not None:
+    _loads = orjson.loads
+
+    def _dump_line(record: dict) -> bytes:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+
+else:
+    _loads = json.loads
+
+    def _dump_line(record: dict) -> bytes:
+        return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
 
 
 EMAIL_RE = re.compile(r"^[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}$", re.IGNORECASE)
 PHONE_RE = re.compile(r"^\+?\d[\d\s\-().]{7,}\d$")
+# Unanchored variant for scanning the joined token stream.
+PHONE_SCAN_RE = re.compile(r"\+?\d[\d\s\-().]{7,}\d")
 DATE_RE = re.compile(r"^\d{2}\.\d{2}\.\d{4}$|^\d{2}\.\d{4}$|^\d{4}-\d{2}-\d{2}$")
 ZIP_RE = re.compile(r"^\d{5}$")
 
@@ -133,8 +170,79 @@ TITLE_KEYWORDS = [
 ]
 
 
+# Keyword groups in label-application order; a later group wins when a token
+# matches several (same precedence as the original per-group checks).
+_KEYWORD_GROUPS = [
+    ("PROFESSION", PROFESSION_KEYWORDS),
+    ("SKILL", SKILL_KEYWORDS),
+    ("EDU_KEYWORD", EDU_KEYWORDS),
+    ("QUALIFICATION", QUAL_KEYWORDS),
+    ("ORG", ORG_KEYWORDS),
+    ("JOB_TITLE", TITLE_KEYWORDS),
+]
+
+
+def _build_keyword_automaton():
+    """Build one Aho-Corasick automaton over all keyword groups, or None.
+
+    Keywords shared by several groups (e.g. "universität") carry the full
+    tuple of their group labels.
+    """
+    if ahocorasick is None:
+        return None
+    labels_by_kw: dict = {}
+    for label, keywords in _KEYWORD_GROUPS:
+        for kw in keywords:
+            labels_by_kw.setdefault(kw, [])
+            if label not in labels_by_kw[kw]:
+                labels_by_kw[kw].append(label)
+    automaton = ahocorasick.Automaton()
+    for kw, labels in labels_by_kw.items():
+        automaton.add_word(kw, tuple(labels))
+    automaton.make_automaton()
+    return automaton
+
+
+# Persisted across invocations; fingerprinted on the group definitions so
+# keyword edits rebuild the automaton.
+_KEYWORD_AUTOMATON = (
+    get_bundle("cv-keywords", _build_keyword_automaton, repr(_KEYWORD_GROUPS).encode("utf-8"))
+    if ahocorasick is not None
+    else None
+)
+
+
+def _keyword_labels(key: str) -> set:
+    """Return the set of group labels whose keywords occur in key."""
+    if _KEYWORD_AUTOMATON is not None:
+        hits = set()
+        for _, labels in _KEYWORD_AUTOMATON.iter(key):
+            hits.update(labels)
+        return hits
+    return {label for label, keywords in _KEYWORD_GROUPS if any(k in key for k in keywords)}
+
+
+_NORM_ALLOWED = frozenset("abcdefghijklmnopqrstuvwxyz0123456789äöüß")
+
+
+class _NormTable(dict):
+    """Lazily-built translate table deleting disallowed codepoints.
+
+    Unknown codepoints are classified once and memoized, so steady-state
+    normalization is a single C-level translate pass per token.
+    """
+
+    def __missing__(self, code: int):
+        result = code if chr(code) in _NORM_ALLOWED else None
+        self[code] = result
+        return result
+
+
+_NORM_TABLE = _NormTable()
+
+
 def _norm(text: str) -> str:
-    return re.sub(r"[^a-zA-Z0-9äöüÄÖÜß]+", "", text.lower())
+    return text.lower().translate(_NORM_TABLE)
 
 
 def _label_span(labels: List[str], start: int, end: int, prefix: str) -> None:
@@ -154,6 +262,12 @@ def _label_record(record: dict) -> int:
     labels = ["O"] * len(tokens)
     labeled = 0
 
+    # Bind the match methods once; these run per token below.
+    email_match = EMAIL_RE.match
+    phone_match = PHONE_RE.match
+    date_match = DATE_RE.match
+    zip_match = ZIP_RE.match
+
     # Name (first two tokens)
     if len(tokens) >= 2:
         _label_span(labels, 0, 1, "NAME_FIRST")
@@ -163,22 +277,30 @@ def _label_record(record: dict) -> int:
     # Email / Phone (single token)
     for i, tok in enumerate(tokens):
         t = tok.strip()
-        if EMAIL_RE.match(t):
+        if email_match(t):
             _label_span(labels, i, i + 1, "EMAIL")
             labeled += 1
-        if PHONE_RE.match(t):
+        if phone_match(t):
             _label_span(labels, i, i + 1, "PHONE")
             labeled += 1
 
-    # Phone (multi-token): combine up to 4 tokens
-    for i in range(len(tokens)):
-        for span in range(2, 5):
-            if i + span > len(tokens):
-                continue
-            candidate = " ".join(tokens[i:i+span]).strip()
-            if PHONE_RE.match(candidate):
-                _label_span(labels, i, i + span, "PHONE")
-                labeled += span
+    # Phone (multi-token): one scan over the joined token stream instead of
+    # re-matching every 2-4 token window. Matches must align with token
+    # boundaries, which the offset table recovers via bisect.
+    joined = " ".join(tokens)
+    starts = [0]
+    for t in tokens:
+        starts.append(starts[-1] + len(t) + 1)
+    for m in PHONE_SCAN_RE.finditer(joined):
+        i = bisect.bisect_right(starts, m.start()) - 1
+        if starts[i] != m.start():
+            continue
+        j = bisect.bisect_left(starts, m.end() + 1)
+        if j >= len(starts) or starts[j] != m.end() + 1:
+            continue
+        if j - i >= 2:
+            _label_span(labels, i, j, "PHONE")
+            labeled += j - i
 
     # Section headers (single-token heuristics)
     for i, tok in enumerate(tokens):
@@ -189,31 +311,20 @@ def _label_record(record: dict) -> int:
 
     # Dates (generic)
     for i, tok in enumerate(tokens):
-        if DATE_RE.match(tok):
+        if date_match(tok):
             _label_span(labels, i, i + 1, "DATE")
             labeled += 1
 
-    # Profession / Skill / Education keyword matching
+    # Profession / Skill / Education keyword matching: one automaton pass
+    # per token instead of six substring scans.
     for i, tok in enumerate(tokens):
-        key = _norm(tok)
-        if any(k in key for k in PROFESSION_KEYWORDS):
-            _label_span(labels, i, i + 1, "PROFESSION")
-            labeled += 1
-        if any(k in key for k in SKILL_KEYWORDS):
-            _label_span(labels, i, i + 1, "SKILL")
-            labeled += 1
-        if any(k in key for k in EDU_KEYWORDS):
-            _label_span(labels, i, i + 1, "EDU_KEYWORD")
-            labeled += 1
-        if any(k in key for k in QUAL_KEYWORDS):
-            _label_span(labels, i, i + 1, "QUALIFICATION")
-            labeled += 1
-        if any(k in key for k in ORG_KEYWORDS):
-            _label_span(labels, i, i + 1, "ORG")
-            labeled += 1
-        if any(k in key for k in TITLE_KEYWORDS):
-            _label_span(labels, i, i + 1, "JOB_TITLE")
-            labeled += 1
+        hits = _keyword_labels(_norm(tok))
+        if not hits:
+            continue
+        for label, _ in _KEYWORD_GROUPS:
+            if label in hits:
+                _label_span(labels, i, i + 1, label)
+                labeled += 1
 
     # Section-aware spans: label tokens between section headers
     current_section = None
@@ -237,7 +348,7 @@ def _label_record(record: dict) -> int:
 
     # Zip/City
     for i, tok in enumerate(tokens):
-        if ZIP_RE.match(tok):
+        if zip_match(tok):
             _label_span(labels, i, i + 1, "ZIPCODE")
             labeled += 1
             if i + 1 < len(tokens):
@@ -249,25 +360,56 @@ def _label_record(record: dict) -> int:
     return labeled
 
 
+def _process_line(line: bytes) -> Tuple[int, int, bytes]:
+    """Worker: decode, label, and re-encode one JSONL line."""
+    record = _loads(line)
+    labeled = _label_record(record)
+    return labeled, len(record.get("tokens") or []), _dump_line(record)
+
+
+def _iter_batches(lines: Iterator[bytes], size: int) -> Iterator[List[bytes]]:
+    """Yield fixed-size batches so the process pool never holds the whole file."""
+    batch = list(itertools.islice(lines, size))
+    while batch:
+        yield batch
+        batch = list(itertools.islice(lines, size))
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Auto-label CV LayoutLM JSONL.")
     parser.add_argument("--input", type=Path, required=True, help="Input JSONL")
     parser.add_argument("--output", type=Path, required=True, help="Output JSONL")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for labeling (1 disables the pool)",
+    )
     args = parser.parse_args()
 
     labeled_tokens = 0
     total_tokens = 0
     records = 0
 
-    with args.input.open("r", encoding="utf-8") as f, args.output.open("w", encoding="utf-8") as out:
-        for line in f:
-            if not line.strip():
-                continue
-            record = json.loads(line)
-            labeled_tokens += _label_record(record)
-            total_tokens += len(record.get("tokens") or [])
-            out.write(json.dumps(record, ensure_ascii=False) + "\n")
-            records += 1
+    with args.input.open("rb") as f, args.output.open("wb", buffering=1 << 20) as out:
+        lines = (line for line in f if line.strip())
+        if args.workers > 1:
+            # Records are independent; labeling is pure-Python CPU work, so a
+            # process pool scales with cores. map keeps output order stable.
+            with ProcessPoolExecutor(max_workers=args.workers) as ex:
+                for batch in _iter_batches(lines, 4096):
+                    for labeled, n_tokens, dumped in ex.map(_process_line, batch, chunksize=64):
+                        labeled_tokens += labeled
+                        total_tokens += n_tokens
+                        out.write(dumped)
+                        records += 1
+        else:
+            for line in lines:
+                labeled, n_tokens, dumped = _process_line(line)
+                labeled_tokens += labeled
+                total_tokens += n_tokens
+                out.write(dumped)
+                records += 1
 
     coverage = (labeled_tokens / total_tokens) if total_tokens else 0.0
     print(f"Labeled {labeled_tokens}/{total_tokens} tokens ({coverage:.2%}) across {records} records.")
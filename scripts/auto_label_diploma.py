@@ -3,10 +3,32 @@
 from __future__ import annotations
 
 import argparse
+import itertools
 import json
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Tuple
+
+
+# Prefer the C JSON codec for large corpora; stdlib json is the fallback.
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+if orjson is not None:
+    _loads = orjson.loads
+
+    def _dump_line(record: dict) -> bytes:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+
+else:
+    _loads = json.loads
+
+    def _dump_line(record: dict) -> bytes:
+        return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
 
 
 DATE_RE = re.compile(r"^(?:0?[1-9]|[12]\\d|3[01])[./-](?:0?[1-9]|1[0-2])[./-](?:19|20)\\d{2}$")
@@ -45,6 +67,14 @@ STATUS_TOKENS = {"bestanden", "abgeschlossen", "graduated", "awarded", "conferre
 CERTIFIED_TOKENS = {"beglaubigte", "beglaubigung", "certified", "copy"}
 NUMBER_TOKENS = {"urkunden-nr", "urkunden", "diploma", "certificate", "no", "nr"}
 
+# Single-token label sets flattened into one lookup; the sets are disjoint,
+# so one dict get replaces three membership tests per token.
+_SINGLE_TOKEN_LABELS: Dict[str, str] = {
+    **{tok: "DEGREE_TYPE" for tok in DEGREE_TYPES},
+    **{tok: "GRADUATION_STATUS" for tok in STATUS_TOKENS},
+    **{tok: "CERTIFIED_COPY_HINT" for tok in CERTIFIED_TOKENS},
+}
+
 
 def _norm(token: str) -> str:
     t = token.strip().lower()
@@ -68,18 +98,17 @@ def _label_record(record: Dict[str, object]) -> int:
         return 0
 
     labels = ["O"] * len(tokens)
+    stripped = [t.strip() for t in tokens]
     norm = [_norm(t) for t in tokens]
     labeled = 0
 
+    date_match = DATE_RE.match
     for i, tok in enumerate(norm):
-        if DATE_RE.match(tokens[i].strip()):
+        if date_match(stripped[i]):
             labeled += _label_span(labels, i, i + 1, "DATE")
-        if tok in DEGREE_TYPES:
-            labeled += _label_span(labels, i, i + 1, "DEGREE_TYPE")
-        if tok in STATUS_TOKENS:
-            labeled += _label_span(labels, i, i + 1, "GRADUATION_STATUS")
-        if tok in CERTIFIED_TOKENS:
-            labeled += _label_span(labels, i, i + 1, "CERTIFIED_COPY_HINT")
+        prefix = _SINGLE_TOKEN_LABELS.get(tok)
+        if prefix:
+            labeled += _label_span(labels, i, i + 1, prefix)
 
     i = 0
     while i < len(norm):
@@ -118,24 +147,54 @@ def _label_record(record: Dict[str, object]) -> int:
     return labeled
 
 
+def _process_line(line: bytes) -> Tuple[int, int, bytes]:
+    """Worker: decode, label, and re-encode one JSONL line."""
+    record = _loads(line)
+    labeled = _label_record(record)
+    return labeled, len(record.get("tokens") or []), _dump_line(record)
+
+
+def _iter_batches(lines: Iterator[bytes], size: int) -> Iterator[List[bytes]]:
+    batch = list(itertools.islice(lines, size))
+    while batch:
+        yield batch
+        batch = list(itertools.islice(lines, size))
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Auto-label diploma JSONL.")
     parser.add_argument("--input", type=Path, required=True)
     parser.add_argument("--output", type=Path, required=True)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for labeling (1 disables the pool)",
+    )
     args = parser.parse_args()
 
     labeled = 0
     total = 0
     records = 0
-    with args.input.open("r", encoding="utf-8") as f, args.output.open("w", encoding="utf-8") as out:
-        for line in f:
-            if not line.strip():
-                continue
-            record = json.loads(line)
-            labeled += _label_record(record)
-            total += len(record.get("tokens") or [])
-            records += 1
-            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    with args.input.open("rb") as f, args.output.open("wb", buffering=1 << 20) as out:
+        lines = (line for line in f if line.strip())
+        if args.workers > 1:
+            # Labeling is CPU-bound on independent records; batches keep
+            # memory bounded and map preserves output order.
+            with ProcessPoolExecutor(max_workers=args.workers) as ex:
+                for batch in _iter_batches(lines, 4096):
+                    for n_labeled, n_tokens, dumped in ex.map(_process_line, batch, chunksize=64):
+                        labeled += n_labeled
+                        total += n_tokens
+                        records += 1
+                        out.write(dumped)
+        else:
+            for line in lines:
+                n_labeled, n_tokens, dumped = _process_line(line)
+                labeled += n_labeled
+                total += n_tokens
+                records += 1
+                out.write(dumped)
 
     pct = (labeled / total * 100) if total else 0.0
     print(f"Labeled {labeled}/{total} tokens ({pct:.2f}%) across {records} records.")
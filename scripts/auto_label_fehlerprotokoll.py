@@ -3,11 +3,35 @@
 from __future__ import annotations
 
 import argparse
+import bisect
+import functools
+import itertools
 import json
+import os
 import re
 import sqlite3
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
+
+
+# Fast JSONL codec (orjson) with a stdlib fallback.
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+if orjson is not None:
+    _loads = orjson.loads
+
+    def _dump_line(record: dict) -> bytes:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+
+else:
+    _loads = json.loads
+
+    def _dump_line(record: dict) -> bytes:
+        return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
 
 
 DATE_TOKEN_RE = re.compile(r"^\d{2}\.\d{2}\.\d{4}$")
@@ -25,15 +49,34 @@ def _norm_token(text: str) -> str:
 
 
 def _find_seq(tokens: List[str], target: List[str], start: int) -> Tuple[int, int] | None:
+    """Find target as a whole-token run via one substring search.
+
+    Joins both sides with spaces and lets str.find (C memmem) locate the
+    candidate, then verifies the hit aligns with token boundaries.
+    """
     if not target:
         return None
-    tlen = len(target)
-    for i in range(start, len(tokens) - tlen + 1):
-        if tokens[i : i + tlen] == target:
-            return i, i + tlen
+    joined = " ".join(tokens)
+    needle = " ".join(target)
+    starts = [0]
+    for t in tokens:
+        starts.append(starts[-1] + len(t) + 1)
+    pos = joined.find(needle, starts[start] if start < len(starts) else len(joined) + 1)
+    while pos != -1:
+        i = bisect.bisect_right(starts, pos) - 1
+        end = i + len(target)
+        if starts[i] == pos and end < len(starts) and starts[end] == pos + len(needle) + 1:
+            return i, end
+        pos = joined.find(needle, pos + 1)
     return None
 
 
+def _next_at_or_after(idxs: List[int], start: int) -> int | None:
+    """First index in the sorted list at or after start, or None."""
+    k = bisect.bisect_left(idxs, start)
+    return idxs[k] if k < len(idxs) else None
+
+
 def _label_span(labels: List[str], start: int, end: int, prefix: str) -> None:
     if start < 0 or end <= start:
         return
@@ -51,13 +94,6 @@ def _split_value(value: str) -> List[str]:
     return [p for p in parts if p]
 
 
-def _find_next(tokens: List[str], start: int, predicate) -> int | None:
-    for i in range(start, len(tokens)):
-        if predicate(tokens[i]):
-            return i
-    return None
-
-
 def _is_date_token(token: str) -> bool:
     return bool(DATE_TOKEN_RE.match(token))
 
@@ -119,9 +155,36 @@ def _label_record(record: dict, *, company_name: str | None) -> int:
     norm_tokens = [_norm_token(t) for t in tokens]
     labels = ["O"] * len(tokens)
 
-    cursor = 0
     labeled = 0
 
+    # Sorted per-kind index lists built in one pass; the per-rule lookups
+    # below become bisect probes instead of repeated linear scans.
+    date_idxs: List[int] = []
+    time_idxs: List[int] = []
+    digit_idxs: List[int] = []
+    fuer_idxs: List[int] = []
+    nonempty_idxs: List[int] = []
+    service_start_idxs: List[int] = []
+    service_end_idxs: List[int] = []
+    druck_idxs: List[int] = []
+    for i, tok in enumerate(norm_tokens):
+        if tok:
+            nonempty_idxs.append(i)
+        if _is_date_token(tok):
+            date_idxs.append(i)
+        if _is_time_token(tok):
+            time_idxs.append(i)
+        if tok.isdigit():
+            digit_idxs.append(i)
+        if tok in FOR_TOKENS:
+            fuer_idxs.append(i)
+        if "§" in tok or tok.startswith("sgb"):
+            service_start_idxs.append(i)
+        if tok in ("xi", "sgb", "sgbxi"):
+            service_end_idxs.append(i)
+        if tok.startswith("druck"):
+            druck_idxs.append(i)
+
     # Company name
     if company_name:
         company_tokens = _split_value(company_name)
@@ -131,24 +194,22 @@ def _label_record(record: dict, *, company_name: str | None) -> int:
             _label_span(labels, start, end, "COMPANY_NAME")
             labeled += (end - start)
 
-    # Report date (token after "datum")
-    for i, tok in enumerate(norm_tokens):
-            if tok in ("datum", "date"):
-                j = _find_next(norm_tokens, i + 1, _is_date_token)
-                if j is not None:
-                    _label_span(labels, j, j + 1, "REPORT_DATE")
-                    labeled += 1
-                # Optional time token right after date
-                k = _find_next(norm_tokens, j + 1, _is_time_token)
-                if k is not None and k == j + 1:
-                    _label_span(labels, k, k + 1, "REPORT_TIME")
-                    labeled += 1
-            break
+    # Report date (token after a leading "datum")
+    if norm_tokens[0] in ("datum", "date"):
+        j = _next_at_or_after(date_idxs, 1)
+        if j is not None:
+            _label_span(labels, j, j + 1, "REPORT_DATE")
+            labeled += 1
+            # Optional time token right after date
+            k = _next_at_or_after(time_idxs, j + 1)
+            if k is not None and k == j + 1:
+                _label_span(labels, k, k + 1, "REPORT_TIME")
+                labeled += 1
 
     # IK number: look for token "ik" then next numeric token
     for i, tok in enumerate(norm_tokens):
         if IK_RE.match(tok):
-            j = _find_next(norm_tokens, i + 1, lambda t: t.isdigit())
+            j = _next_at_or_after(digit_idxs, i + 1)
             if j is not None:
                 _label_span(labels, j, j + 1, "IK")
                 labeled += 1
@@ -159,9 +220,8 @@ def _label_record(record: dict, *, company_name: str | None) -> int:
         if _is_zip(tok):
             _label_span(labels, i, i + 1, "ZIPCODE")
             labeled += 1
-            town_idx = _find_next(norm_tokens, i + 1, lambda t: t.isalpha())
-            if town_idx is not None and town_idx == i + 1:
-                _label_span(labels, town_idx, town_idx + 1, "TOWN")
+            if i + 1 < len(norm_tokens) and norm_tokens[i + 1].isalpha():
+                _label_span(labels, i + 1, i + 2, "TOWN")
                 labeled += 1
             break
 
@@ -196,14 +256,13 @@ def _label_record(record: dict, *, company_name: str | None) -> int:
                 labeled += 1
 
             # Find "für"
-            fuer_idx = _find_next(norm_tokens, i + 1, lambda t: t in FOR_TOKENS)
+            fuer_idx = _next_at_or_after(fuer_idxs, i + 1)
             if fuer_idx is not None:
                 # Last name and first name
-                last_idx = _find_next(norm_tokens, fuer_idx + 1, lambda t: t)
-                first_idx = _find_next(
-                    norm_tokens,
+                last_idx = _next_at_or_after(nonempty_idxs, fuer_idx + 1)
+                first_idx = _next_at_or_after(
+                    nonempty_idxs,
                     (last_idx + 1) if last_idx is not None else fuer_idx + 1,
-                    lambda t: t,
                 )
                 if last_idx is not None:
                     _label_span(labels, last_idx, last_idx + 1, "CUSTOMER_LAST")
@@ -213,10 +272,10 @@ def _label_record(record: dict, *, company_name: str | None) -> int:
                     labeled += 1
 
                 # Date range (two date tokens)
-                start_date_idx = _find_next(norm_tokens, fuer_idx + 1, _is_date_token)
+                start_date_idx = _next_at_or_after(date_idxs, fuer_idx + 1)
                 end_date_idx = None
                 if start_date_idx is not None:
-                    end_date_idx = _find_next(norm_tokens, start_date_idx + 1, _is_date_token)
+                    end_date_idx = _next_at_or_after(date_idxs, start_date_idx + 1)
                 if start_date_idx is not None:
                     _label_span(labels, start_date_idx, start_date_idx + 1, "PERIOD_START")
                     labeled += 1
@@ -225,23 +284,17 @@ def _label_record(record: dict, *, company_name: str | None) -> int:
                     labeled += 1
 
                 # Service span (from § to XI)
-                service_start = _find_next(
-                    norm_tokens, fuer_idx + 1, lambda t: "§" in t or t.startswith("§") or t.startswith("sgb")
-                )
+                service_start = _next_at_or_after(service_start_idxs, fuer_idx + 1)
                 if service_start is not None:
-                    service_end = _find_next(
-                        norm_tokens,
-                        service_start + 1,
-                        lambda t: t in ("xi", "sgb", "sgbxi"),
-                    )
+                    service_end = _next_at_or_after(service_end_idxs, service_start + 1)
                     if service_end is not None:
                         _label_span(labels, service_start, service_end + 1, "SERVICE")
                         labeled += (service_end + 1 - service_start)
 
                         # Error type starts at next "für" after service and ends at "drucken"
-                        err_start = _find_next(norm_tokens, service_end + 1, lambda t: t in FOR_TOKENS)
+                        err_start = _next_at_or_after(fuer_idxs, service_end + 1)
                         if err_start is not None:
-                            err_end = _find_next(norm_tokens, err_start + 1, lambda t: t.startswith("druck"))
+                            err_end = _next_at_or_after(druck_idxs, err_start + 1)
                             if err_end is not None:
                                 _label_span(labels, err_start, err_end + 1, "ERROR_TYPE")
                                 labeled += (err_end + 1 - err_start)
@@ -264,6 +317,20 @@ def _load_company_name(db_path: Path) -> str | None:
     return row[0]
 
 
+def _process_line(line: bytes, *, company_name: str | None) -> Tuple[int, int, bytes]:
+    """Worker: decode, label, and re-encode one JSONL line."""
+    record = _loads(line)
+    labeled = _label_record(record, company_name=company_name)
+    return labeled, len(record.get("tokens") or []), _dump_line(record)
+
+
+def _iter_batches(lines: Iterator[bytes], size: int) -> Iterator[List[bytes]]:
+    batch = list(itertools.islice(lines, size))
+    while batch:
+        yield batch
+        batch = list(itertools.islice(lines, size))
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Auto-label Fehlerprotokoll LayoutLM JSONL.")
     parser.add_argument("--input", type=Path, required=True, help="Input JSONL")
@@ -275,23 +342,40 @@ def main() -> None:
         default=Path("apps/company_universe/db/company.sqlite"),
         help="SQLite DB to read company name from (if not provided)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for labeling (1 disables the pool)",
+    )
     args = parser.parse_args()
 
     company_name = args.company_name or _load_company_name(args.company_db)
+    process_line = functools.partial(_process_line, company_name=company_name)
 
     labeled_tokens = 0
     total_tokens = 0
     records = 0
 
-    with args.input.open("r", encoding="utf-8") as f, args.output.open("w", encoding="utf-8") as out:
-        for line in f:
-            if not line.strip():
-                continue
-            record = json.loads(line)
-            labeled_tokens += _label_record(record, company_name=company_name)
-            total_tokens += len(record.get("tokens") or [])
-            out.write(json.dumps(record, ensure_ascii=False) + "\n")
-            records += 1
+    with args.input.open("rb") as f, args.output.open("wb", buffering=1 << 20) as out:
+        lines = (line for line in f if line.strip())
+        if args.workers > 1:
+            # Per-record labeling is independent CPU work; the pool keeps all
+            # cores busy while map preserves the input order.
+            with ProcessPoolExecutor(max_workers=args.workers) as ex:
+                for batch in _iter_batches(lines, 4096):
+                    for labeled, n_tokens, dumped in ex.map(process_line, batch, chunksize=64):
+                        labeled_tokens += labeled
+                        total_tokens += n_tokens
+                        out.write(dumped)
+                        records += 1
+        else:
+            for line in lines:
+                labeled, n_tokens, dumped = process_line(line)
+                labeled_tokens += labeled
+                total_tokens += n_tokens
+                out.write(dumped)
+                records += 1
 
     coverage = (labeled_tokens / total_tokens) if total_tokens else 0.0
     print(f"Labeled {labeled_tokens}/{total_tokens} tokens ({coverage:.2%}) across {records} records.")
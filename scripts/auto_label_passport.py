@@ -3,20 +3,82 @@
 from __future__ import annotations
 
 import argparse
+import bisect
+import functools
+import heapq
+import itertools
 import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+# Prefer the C JSON codec for large corpora; stdlib json is the fallback.
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+if orjson is not None:
+    _loads = orjson.loads
+
+    def _dump_line(record: dict) -> bytes:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+
+else:
+    _loads = json.loads
+
+    def _dump_line(record: dict) -> bytes:
+        return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class _MrzNormTable(dict):
+    """Translate table that lazily memoizes keep/delete per codepoint.
+
+    str.translate deletes characters mapped to None, so one C-level pass
+    replaces the per-character generator filter; each codepoint is
+    classified once per process.
+    """
+
+    def __missing__(self, code: int) -> int | None:
+        ch = chr(code)
+        out = code if (ch.isalnum() or ch == "<") else None
+        self[code] = out
+        return out
+
+
+_MRZ_NORM_TABLE = _MrzNormTable()
 
 
 def _norm_mrz_token(text: str) -> str:
     t = text.strip().upper().replace(" ", "")
-    return "".join(ch for ch in t if ch.isalnum() or ch == "<")
+    if t.isalnum():
+        # Fast path: nothing to delete.
+        return t
+    return t.translate(_MRZ_NORM_TABLE)
+
+
+class _DigitsOnlyTable(dict):
+    """Translate table keeping digits and deleting everything else."""
+
+    def __missing__(self, code: int) -> int | None:
+        out = code if chr(code).isdigit() else None
+        self[code] = out
+        return out
+
+
+_DIGITS_ONLY_TABLE = _DigitsOnlyTable()
 
 
 def _is_mrz_token(token: str) -> bool:
     if not token:
         return False
-    return all(ch.isalnum() or ch == "<" for ch in token)
+    # Deleting invalid chars shortens the string; equal length means every
+    # char is alnum or '<' (one C pass instead of a per-char loop).
+    return len(token.translate(_MRZ_NORM_TABLE)) == len(token)
 
 
 def _bbox_center_y(bbox: List[int]) -> float:
@@ -25,89 +87,92 @@ def _bbox_center_y(bbox: List[int]) -> float:
 
 def _build_lines(tokens: List[str], bboxes: List[List[int]], meta: List[Dict[str, object]] | None) -> List[Dict[str, object]]:
     if meta and len(meta) == len(tokens):
-        lines: Dict[Tuple[int, int, int], List[Tuple[int, str, List[int], int]]] = {}
-        for idx, tok in enumerate(tokens):
-            m = meta[idx]
-            key = (m.get("block_num", 0), m.get("par_num", 0), m.get("line_num", 0))
-            lines.setdefault(key, []).append((idx, tok, bboxes[idx], m.get("word_num", 0)))
+        # One lexicographic sort on (block, par, line, word) replaces the
+        # per-token dict setdefault plus per-line word sort; groupby then
+        # yields each line's tokens already in word order.
+        keyed = [
+            (
+                (
+                    meta[idx].get("block_num", 0),
+                    meta[idx].get("par_num", 0),
+                    meta[idx].get("line_num", 0),
+                    meta[idx].get("word_num", 0),
+                ),
+                idx,
+                tok,
+                bboxes[idx],
+            )
+            for idx, tok in enumerate(tokens)
+        ]
+        keyed.sort(key=lambda item: (item[0], item[1]))
 
         out: List[Dict[str, object]] = []
-        for items in lines.values():
-            items.sort(key=lambda t: t[3])
-            out.append(_assemble_line(items))
+        for _line_key, group in itertools.groupby(keyed, key=lambda item: item[0][:3]):
+            out.append(_assemble_line([(idx, tok, bbox, key[3]) for key, idx, tok, bbox in group]))
         return [l for l in out if l["line"]]
 
-    # Fallback: cluster by y-position.
-    items = []
-    heights = []
-    for idx, (tok, bbox) in enumerate(zip(tokens, bboxes)):
-        y = _bbox_center_y(bbox)
-        h = abs(bbox[3] - bbox[1])
-        heights.append(h)
-        items.append((idx, tok, bbox, y))
-    if not items:
+    # Fallback: cluster by y-position. Centers, sort order, and line
+    # breakpoints are computed in vectorized NumPy passes; a y-gap wider
+    # than the tolerance starts a new line.
+    if not tokens:
         return []
-    heights.sort()
-    median_h = heights[len(heights) // 2] if heights else 10
+    bbox_arr = np.asarray(bboxes, dtype=np.float64)
+    ys = (bbox_arr[:, 1] + bbox_arr[:, 3]) * 0.5
+    heights = np.abs(bbox_arr[:, 3] - bbox_arr[:, 1])
+    # partition puts sorted[n // 2] (the high median) in place in O(n).
+    median_h = float(np.partition(heights, heights.size // 2)[heights.size // 2])
     tol = max(2.0, median_h * 0.6)
 
-    items.sort(key=lambda t: t[3])
-    lines: List[List[Tuple[int, str, List[int], float]]] = []
-    current: List[Tuple[int, str, List[int], float]] = []
-    current_y = None
-    for item in items:
-        if current_y is None or abs(item[3] - current_y) <= tol:
-            current.append(item)
-            current_y = item[3] if current_y is None else (current_y + item[3]) / 2
-        else:
-            lines.append(current)
-            current = [item]
-            current_y = item[3]
-    if current:
-        lines.append(current)
+    order = np.argsort(ys, kind="stable")
+    breaks = np.where(np.diff(ys[order]) > tol)[0] + 1
 
     out_lines: List[Dict[str, object]] = []
-    for line_items in lines:
+    for group in np.split(order, breaks):
+        line_items = [(int(i), tokens[i], bboxes[i], 0) for i in group]
         line_items.sort(key=lambda t: t[2][0])
-        out_lines.append(_assemble_line([(idx, tok, bbox, 0) for idx, tok, bbox, _y in line_items]))
+        out_lines.append(_assemble_line(line_items))
     return [l for l in out_lines if l["line"]]
 
 
 def _assemble_line(items: List[Tuple[int, str, List[int], int | float]]) -> Dict[str, object]:
-    mapping: List[Tuple[int, int, int]] = []
+    # Preallocate at the upper bound and index-assign instead of growing
+    # via append; the running y sum avoids re-iterating for the average.
+    count = len(items)
+    mapping: List[Tuple[int, int, int]] = [None] * count  # type: ignore[list-item]
+    parts: List[str] = [None] * count  # type: ignore[list-item]
+    indices: List[int] = [None] * count  # type: ignore[list-item]
     pos = 0
-    parts: List[str] = []
-    ys: List[float] = []
-    indices: List[int] = []
+    n = 0
+    y_sum = 0.0
     for idx, raw, bbox, _order in items:
         tok = _norm_mrz_token(raw)
         if not tok:
             continue
-        start = pos
         end = pos + len(tok)
-        mapping.append((idx, start, end))
-        parts.append(tok)
+        mapping[n] = (idx, pos, end)
+        parts[n] = tok
+        indices[n] = idx
         pos = end
-        ys.append(_bbox_center_y(bbox))
-        indices.append(idx)
-    line = "".join(parts)
+        y_sum += _bbox_center_y(bbox)
+        n += 1
+    if n != count:
+        del mapping[n:], parts[n:], indices[n:]
     return {
         "indices": indices,
-        "line": line,
+        "line": "".join(parts),
         "mapping": mapping,
-        "y": sum(ys) / len(ys) if ys else 0.0,
+        "y": y_sum / n if n else 0.0,
     }
 
 
 def _is_mrz_line(line: str) -> bool:
     if len(line) < 30:
         return False
-    if not all(ch.isalnum() or ch == "<" for ch in line):
+    if len(line.translate(_MRZ_NORM_TABLE)) != len(line):
         return False
     if line.count("<") >= 2:
         return True
-    digit_count = sum(ch.isdigit() for ch in line)
-    return digit_count >= 10
+    return len(line.translate(_DIGITS_ONLY_TABLE)) >= 10
 
 
 def _select_mrz_lines(lines: List[Dict[str, object]]) -> List[Dict[str, object]]:
@@ -116,43 +181,64 @@ def _select_mrz_lines(lines: List[Dict[str, object]]) -> List[Dict[str, object]]
     candidates = [l for l in lines if _is_mrz_line(l["line"])]
     if not candidates:
         return []
-    candidates.sort(key=lambda l: (abs(len(l["line"]) - 44), l["y"]))
-    chosen = candidates[:2]
+    # Only the best two candidates are needed; nsmallest avoids sorting
+    # the whole list when a page has many MRZ-looking lines.
+    chosen = heapq.nsmallest(2, candidates, key=lambda l: (abs(len(l["line"]) - 44), l["y"]))
     chosen.sort(key=lambda l: l["y"])
     return chosen
 
 
-def _label_span(labels: List[str], mapping: List[Tuple[int, int, int]], start: int, end: int, prefix: str) -> int:
+def _label_span(
+    labels: List[str],
+    mapping: List[Tuple[int, int, int]],
+    starts: List[int],
+    start: int,
+    end: int,
+    prefix: str,
+) -> int:
+    """Label tokens overlapping [start, end) in the line's char space.
+
+    mapping is emitted in ascending start order, so a bisect on the
+    precomputed starts jumps to the first candidate and the scan stops at
+    the first token past the span instead of walking the whole line.
+    """
     if start >= end:
         return 0
     touched = 0
-    first = True
-    for idx, t_start, t_end in mapping:
-        if t_end <= start or t_start >= end:
+    tag = f"B-{prefix}"
+    inside = f"I-{prefix}"
+    lo = bisect.bisect_right(starts, start) - 1
+    if lo < 0:
+        lo = 0
+    for j in range(lo, len(mapping)):
+        idx, t_start, t_end = mapping[j]
+        if t_start >= end:
+            break
+        if t_end <= start:
             continue
         if labels[idx] != "O":
             continue
-        labels[idx] = f"B-{prefix}" if first else f"I-{prefix}"
-        first = False
+        labels[idx] = tag
+        tag = inside
         touched += 1
     return touched
 
 
+# Surname runs to the first '<<' separator, given names to the trailing
+# '<' filler; both non-greedy groups land on the same splits the old
+# rstrip + split pair produced, in one pass with no intermediate strings.
+_NAME_RE = re.compile(r"(.*?)(?:<<(.*?))?<*")
+
+
 def _name_spans(line1: str) -> List[Tuple[str, int, int]]:
     spans: List[Tuple[str, int, int]] = []
-    name_area = line1[5:]
-    name_area = name_area.rstrip("<")
-    if not name_area:
+    m = _NAME_RE.fullmatch(line1, 5)
+    if m is None:
         return spans
-    if "<<" in name_area:
-        surname, given = name_area.split("<<", 1)
-        if surname:
-            spans.append(("SURNAME", 5, 5 + len(surname)))
-        if given:
-            given_start = 5 + len(surname) + 2
-            spans.append(("GIVEN_NAMES", given_start, given_start + len(given)))
-    else:
-        spans.append(("SURNAME", 5, 5 + len(name_area)))
+    if m.end(1) > m.start(1):
+        spans.append(("SURNAME", m.start(1), m.end(1)))
+    if m.start(2) != -1 and m.end(2) > m.start(2):
+        spans.append(("GIVEN_NAMES", m.start(2), m.end(2)))
     return spans
 
 
@@ -164,6 +250,11 @@ def _label_record(record: Dict[str, object], *, mode: str) -> int:
     if len(tokens) != len(bboxes) or not tokens:
         record["labels"] = labels
         return 0
+    # MRZ lines always carry '<' filler; a record without any '<' cannot
+    # yield two MRZ lines, so skip line building for non-passport pages.
+    if not any("<" in t for t in tokens):
+        record["labels"] = labels
+        return 0
     meta = record.get("token_meta")
     lines = _select_mrz_lines(_build_lines(tokens, bboxes, meta))
     if len(lines) < 2:
@@ -172,39 +263,55 @@ def _label_record(record: Dict[str, object], *, mode: str) -> int:
 
     line1 = lines[0]["line"]
     mapping1 = lines[0]["mapping"]
+    starts1 = [m[1] for m in mapping1]
     line2 = lines[1]["line"]
     mapping2 = lines[1]["mapping"]
+    starts2 = [m[1] for m in mapping2]
 
     labeled = 0
     if mode == "lines":
-        labeled += _label_span(labels, mapping1, 0, len(line1), "MRZ_LINE1")
-        labeled += _label_span(labels, mapping2, 0, len(line2), "MRZ_LINE2")
+        labeled += _label_span(labels, mapping1, starts1, 0, len(line1), "MRZ_LINE1")
+        labeled += _label_span(labels, mapping2, starts2, 0, len(line2), "MRZ_LINE2")
         record["labels"] = labels
         return labeled
 
     if len(line1) >= 44:
-        labeled += _label_span(labels, mapping1, 0, 2, "DOC_CODE")
-        labeled += _label_span(labels, mapping1, 2, 5, "ISSUING_COUNTRY")
+        labeled += _label_span(labels, mapping1, starts1, 0, 2, "DOC_CODE")
+        labeled += _label_span(labels, mapping1, starts1, 2, 5, "ISSUING_COUNTRY")
         for prefix, start, end in _name_spans(line1):
-            labeled += _label_span(labels, mapping1, start, end, prefix)
+            labeled += _label_span(labels, mapping1, starts1, start, end, prefix)
 
     if len(line2) >= 44:
-        labeled += _label_span(labels, mapping2, 0, 9, "PASSPORT_NUMBER")
-        labeled += _label_span(labels, mapping2, 9, 10, "PASSPORT_NUMBER_CHECK")
-        labeled += _label_span(labels, mapping2, 10, 13, "NATIONALITY")
-        labeled += _label_span(labels, mapping2, 13, 19, "BIRTH_DATE")
-        labeled += _label_span(labels, mapping2, 19, 20, "BIRTH_DATE_CHECK")
-        labeled += _label_span(labels, mapping2, 20, 21, "SEX")
-        labeled += _label_span(labels, mapping2, 21, 27, "EXPIRY_DATE")
-        labeled += _label_span(labels, mapping2, 27, 28, "EXPIRY_DATE_CHECK")
-        labeled += _label_span(labels, mapping2, 28, 42, "PERSONAL_NUMBER")
-        labeled += _label_span(labels, mapping2, 42, 43, "PERSONAL_NUMBER_CHECK")
-        labeled += _label_span(labels, mapping2, 43, 44, "FINAL_CHECK")
+        labeled += _label_span(labels, mapping2, starts2, 0, 9, "PASSPORT_NUMBER")
+        labeled += _label_span(labels, mapping2, starts2, 9, 10, "PASSPORT_NUMBER_CHECK")
+        labeled += _label_span(labels, mapping2, starts2, 10, 13, "NATIONALITY")
+        labeled += _label_span(labels, mapping2, starts2, 13, 19, "BIRTH_DATE")
+        labeled += _label_span(labels, mapping2, starts2, 19, 20, "BIRTH_DATE_CHECK")
+        labeled += _label_span(labels, mapping2, starts2, 20, 21, "SEX")
+        labeled += _label_span(labels, mapping2, starts2, 21, 27, "EXPIRY_DATE")
+        labeled += _label_span(labels, mapping2, starts2, 27, 28, "EXPIRY_DATE_CHECK")
+        labeled += _label_span(labels, mapping2, starts2, 28, 42, "PERSONAL_NUMBER")
+        labeled += _label_span(labels, mapping2, starts2, 42, 43, "PERSONAL_NUMBER_CHECK")
+        labeled += _label_span(labels, mapping2, starts2, 43, 44, "FINAL_CHECK")
 
     record["labels"] = labels
     return labeled
 
 
+def _process_line(line: bytes, *, mode: str) -> Tuple[int, int, bytes]:
+    """Worker: decode, label, and re-encode one JSONL line."""
+    record = _loads(line)
+    labeled = _label_record(record, mode=mode)
+    return labeled, len(record.get("tokens") or []), _dump_line(record)
+
+
+def _iter_batches(lines: Iterator[bytes], size: int) -> Iterator[List[bytes]]:
+    batch = list(itertools.islice(lines, size))
+    while batch:
+        yield batch
+        batch = list(itertools.islice(lines, size))
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Auto-label passport MRZ fields in LayoutLM JSONL")
     parser.add_argument("--input", type=Path, required=True)
@@ -215,21 +322,47 @@ def main() -> None:
         default="lines",
         help="Label MRZ line spans only (lines) or detailed fields (fields).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for labeling (1 disables the pool)",
+    )
     args = parser.parse_args()
 
     labeled = 0
     total = 0
     records = 0
 
-    with args.input.open("r", encoding="utf-8") as f, args.output.open("w", encoding="utf-8") as out:
-        for line in f:
-            if not line.strip():
-                continue
-            record = json.loads(line)
-            labeled += _label_record(record, mode=args.mode)
-            total += len(record.get("tokens") or [])
-            records += 1
-            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    process_line = functools.partial(_process_line, mode=args.mode)
+    out_buf: List[bytes] = []
+    with args.input.open("rb") as f, args.output.open("wb", buffering=1 << 20) as out:
+        # Bytes lines keep their trailing \n; the length check skips blanks
+        # without the per-line strip() allocation.
+        lines = (line for line in f if len(line) > 1)
+        if args.workers > 1:
+            # Labeling is CPU-bound on independent records; batches keep
+            # memory bounded and map preserves output order.
+            with ProcessPoolExecutor(max_workers=args.workers) as ex:
+                for batch in _iter_batches(lines, 4096):
+                    for n_labeled, n_tokens, dumped in ex.map(process_line, batch, chunksize=64):
+                        labeled += n_labeled
+                        total += n_tokens
+                        records += 1
+                        out_buf.append(dumped)
+                    out.writelines(out_buf)
+                    out_buf.clear()
+        else:
+            for line in lines:
+                n_labeled, n_tokens, dumped = process_line(line)
+                labeled += n_labeled
+                total += n_tokens
+                records += 1
+                out_buf.append(dumped)
+                if len(out_buf) >= 1000:
+                    out.writelines(out_buf)
+                    out_buf.clear()
+        out.writelines(out_buf)
 
     pct = (labeled / total * 100) if total else 0.0
     print(f"Labeled {labeled}/{total} tokens ({pct:.2f}%) across {records} records.")
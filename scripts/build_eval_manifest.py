@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 from pathlib import Path
 from typing import Iterable, List
 
@@ -11,8 +12,18 @@ from typing import Iterable, List
 def _iter_paths(path_str: str) -> Iterable[Path]:
     path = Path(path_str)
     if path.is_dir():
-        for ext in ("*.pdf", "*.png", "*.jpg", "*.jpeg"):
-            for item in sorted(path.glob(ext)):
+        # One scandir pass instead of a directory walk per extension;
+        # bucketing keeps the original pdf/png/jpg/jpeg group ordering.
+        exts = (".pdf", ".png", ".jpg", ".jpeg")
+        by_ext: dict[str, List[Path]] = {ext: [] for ext in exts}
+        for entry in os.scandir(path):
+            if not entry.is_file():
+                continue
+            suffix = Path(entry.name).suffix
+            if suffix in by_ext:
+                by_ext[suffix].append(Path(entry.path))
+        for ext in exts:
+            for item in sorted(by_ext[ext]):
                 yield item
         return
     for item in sorted(Path().glob(path_str)):
@@ -9,17 +9,46 @@ Outputs:
 from __future__ import annotations
 
 import argparse
+import functools
 import json
+import os
 import pathlib
-import random
 import fnmatch
+import re
 import sys
-from typing import Dict, Iterable, List, Set, Tuple
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
+import numpy as np
 from PIL import Image
 
-from caesar_ocr.io.loaders import load_images_from_bytes
-from caesar_ocr.ocr.tesseract import ocr_tokens_from_image
+from caesar_ocr.io.loaders import iter_images_from_path
+from caesar_ocr.ocr.tesseract import ocr_tokens_batch, ocr_tokens_from_image
+
+# Prefer the C JSON codec for large corpora; stdlib json is the fallback.
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+if orjson is not None:
+    _loads = orjson.loads
+
+    def _dump_line(record: dict) -> bytes:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+
+    def _dumps(record: dict) -> bytes:
+        return orjson.dumps(record)
+
+else:
+    _loads = json.loads
+
+    def _dump_line(record: dict) -> bytes:
+        return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+    def _dumps(record: dict) -> bytes:
+        return json.dumps(record, ensure_ascii=False).encode("utf-8")
 
 
 def _extract_tokens(image: Image.Image, *, lang: str, psm: int) -> Tuple[str, List[Dict[str, object]]]:
@@ -36,6 +65,132 @@ def _extract_tokens(image: Image.Image, *, lang: str, psm: int) -> Tuple[str, Li
     return full_text, tokens
 
 
+def _init_ocr_worker() -> None:
+    """Pin Tesseract to one thread per worker process.
+
+    One single-threaded Tesseract per core beats N multi-threaded instances
+    fighting over the same cores; the limit must be in the environment
+    before the first Tesseract invocation in the process.
+    """
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def _process_input(
+    path_str: str,
+    *,
+    lang: str,
+    psm: int,
+    images_dir: str,
+    write_page_images: bool = True,
+    ocr_mode: str = "RGB",
+) -> List[Dict[str, object]]:
+    """
+    OCR one input file (image or PDF) and return its per-page results.
+
+    Runs in a worker process; only picklable data crosses back to the
+    parent, which does all JSON serialization, writing, and RNG splitting.
+
+    :param path_str: Input file path
+    :param lang: Tesseract language(s)
+    :param psm: Tesseract page segmentation mode
+    :param images_dir: Directory for extracted PDF page images
+    :param write_page_images: Write PDF page PNGs (records keep the path either way)
+    :param ocr_mode: Pixel mode fed to Tesseract ("RGB", or "L" for B/W scans)
+    :return: List of per-page dicts matching _record_from_tokens kwargs
+    """
+    input_path = pathlib.Path(path_str)
+    results: List[Dict[str, object]] = []
+    if input_path.suffix.lower() == ".pdf":
+        # Pages render lazily; a single prefetch thread rasterizes page
+        # N+1 (poppler runs as a subprocess, so the GIL is free) while
+        # Tesseract works on page N. At most two page images are alive.
+        doc_id = input_path.stem
+        pages = iter_images_from_path(input_path, dpi=300)
+        with ThreadPoolExecutor(max_workers=1) as render_pool:
+            upcoming = render_pool.submit(next, pages, None)
+            while True:
+                page = upcoming.result()
+                if page is None:
+                    break
+                upcoming = render_pool.submit(next, pages, None)
+                page_image_path = pathlib.Path(images_dir) / f"{doc_id}_page_{page.page:03d}.png"
+                if write_page_images:
+                    page_image_path = _write_page_image(page.image, pathlib.Path(images_dir), doc_id, page.page)
+                full_text, tokens = _extract_tokens(page.image, lang=lang, psm=psm)
+                results.append(
+                    {
+                        "image_path": str(page_image_path),
+                        "doc_id": doc_id,
+                        "page_idx": page.page,
+                        "full_text": full_text,
+                        "tokens": tokens,
+                        "width": page.width,
+                        "height": page.height,
+                        "source_pdf": str(input_path),
+                    }
+                )
+    else:
+        # Open once: convert and size come from the same Image handle.
+        # Skip the convert when the image is already in the target mode --
+        # convert() always copies, and that copy is pure memory bandwidth
+        # on large scans.
+        with Image.open(input_path) as im:
+            if im.mode == ocr_mode:
+                im.load()
+                image = im
+            else:
+                image = im.convert(ocr_mode)
+        width, height = image.size
+        full_text, tokens = _extract_tokens(image, lang=lang, psm=psm)
+        results.append(
+            {
+                "image_path": str(input_path),
+                "doc_id": input_path.stem,
+                "page_idx": 1,
+                "full_text": full_text,
+                "tokens": tokens,
+                "width": width,
+                "height": height,
+                "source_pdf": None,
+            }
+        )
+    return results
+
+
+def _process_image_list(paths: List[str], *, lang: str, psm: int) -> List[List[Dict[str, object]]]:
+    """
+    OCR a chunk of image files through one Tesseract invocation.
+
+    Batch mode amortizes engine startup and model load across the chunk
+    and lets Tesseract read the files directly from disk.
+
+    :param paths: Image file paths (no PDFs)
+    :param lang: Tesseract language(s)
+    :param psm: Tesseract page segmentation mode
+    :return: One single-element result list per path, in input order
+    """
+    results: List[List[Dict[str, object]]] = []
+    for path_str, (full_text, tokens) in zip(paths, ocr_tokens_batch(paths, lang=lang, psm=psm)):
+        # Image.open reads only the header here; pixels stay on disk.
+        with Image.open(path_str) as im:
+            width, height = im.size
+        results.append(
+            [
+                {
+                    "image_path": path_str,
+                    "doc_id": pathlib.Path(path_str).stem,
+                    "page_idx": 1,
+                    "full_text": full_text,
+                    "tokens": tokens,
+                    "width": width,
+                    "height": height,
+                    "source_pdf": None,
+                }
+            ]
+        )
+    return results
+
+
 def _iter_batches(items: List[pathlib.Path], batch_size: int) -> Iterable[List[pathlib.Path]]:
     """
     Yield successive batches of items from the list.
@@ -48,70 +203,59 @@ def _iter_batches(items: List[pathlib.Path], batch_size: int) -> Iterable[List[p
         yield items[i : i + batch_size]
 
 
-def _load_processed_images(path: pathlib.Path) -> Set[str]:
+def _load_processed_images(path: pathlib.Path) -> Set[int]:
     """
-    Load a set of processed image or PDF filenames from a JSONL file.
+    Load the set of processed image or PDF filenames from a JSONL file.
+
+    Entries are stored as 64-bit string hashes rather than the paths
+    themselves, cutting the memory of the processed set by an order of
+    magnitude on large corpora; membership tests hash the candidate path
+    the same way. Hashes are only compared within this process, so the
+    per-process hash randomization is irrelevant.
 
     :param path: Path to the JSONL file
-    :return: Set of processed image or PDF filenames
+    :return: Set of hashed processed image or PDF filenames
     """
+    # The plain-text sidecar (one path per line) avoids parsing every JSON
+    # record again on resume; older outputs without one fall back to the
+    # full JSONL scan (which also seeds the sidecar).
+    sidecar = path.with_suffix(".processed.txt")
+    if sidecar.exists():
+        return {hash(line) for line in sidecar.read_text().splitlines() if line}
     if not path.exists():
         return set()
-    
+
     # Load processed images or PDFs from existing JSONL
-    processed = set()
+    processed: Set[str] = set()
     # Read each line and extract image and source_pdf fields
-    for line in path.read_text().splitlines():
-        if not line.strip():
-            continue
-        try:
-            # Parse JSON line
-            rec = json.loads(line)
-        except json.JSONDecodeError:
-            continue
-        # Extract image and source_pdf fields
-        # image = record image path
-        # source_pdf = record source PDF path (if any)
-        image = rec.get("image")
-        if image:
-            processed.add(image)
-        source_pdf = rec.get("source_pdf")
-        if source_pdf:
-            processed.add(source_pdf)
-    return processed
-
-
-def _task_key(doc_id: str, page: int, image: str) -> str:
-    """
-    Generate a unique task key based on document ID, page number, and image path.
-
-    :param doc_id: Document identifier
-    :param page: Page number
-    :param image: Image path
-    :return: Unique task key string
-    """
-    # format: "{doc_id}::{page}::{image}"
-    # use double colons to avoid conflicts with filenames
-    return f"{doc_id}::{page}::{image}"
-
-
-def _write_tasks(path: pathlib.Path, tasks: List[Dict[str, object]], fmt: str) -> None:
-    """
-    Write tasks to a file in JSON or JSONL format.
-    task: List of task dictionaries with "data" and "meta" fields.
-    
-    :param path: Output file path
-    :param tasks: List of task dictionaries
-    :param fmt: Output format ("json" or "jsonl")
-    """
-    path.parent.mkdir(parents=True, exist_ok=True)
-    # if format is json, write as a single JSON array
-    if fmt == "json":
-        path.write_text(json.dumps(tasks, ensure_ascii=False, indent=2))
-        return
-    with path.open("w", encoding="utf-8") as f:
-        for task in tasks:
-            f.write(json.dumps(task, ensure_ascii=False) + "\n")
+    with path.open("rb", buffering=1 << 20) as f:
+        for line in f:
+            # Bytes lines keep their trailing \n; skip blanks without the
+            # per-line strip() allocation.
+            if len(line) <= 1:
+                continue
+            # Only two keys matter; skip the JSON parse when neither can
+            # appear in the line.
+            if b'"image"' not in line and b'"source_pdf"' not in line:
+                continue
+            try:
+                # Parse JSON line
+                rec = _loads(line)
+            except ValueError:
+                continue
+            # Extract image and source_pdf fields
+            # image = record image path
+            # source_pdf = record source PDF path (if any)
+            image = rec.get("image")
+            if image:
+                processed.add(image)
+            source_pdf = rec.get("source_pdf")
+            if source_pdf:
+                processed.add(source_pdf)
+    if processed:
+        # Seed the sidecar so the next resume skips the JSONL scan.
+        sidecar.write_text("\n".join(sorted(processed)) + "\n", encoding="utf-8")
+    return {hash(entry) for entry in processed}
 
 
 def _collect_inputs(input_dir: pathlib.Path, image_exts: List[str], pdf_exts: List[str]) -> List[pathlib.Path]:
@@ -123,14 +267,17 @@ def _collect_inputs(input_dir: pathlib.Path, image_exts: List[str], pdf_exts: Li
     :param pdf_exts: List of PDF file extensions
     :return: Sorted list of unique input file paths
     """
-    inputs: List[pathlib.Path] = []
-    # Collect image files
-    for ext in image_exts:
-        inputs.extend(input_dir.glob(f"*.{ext}"))
-    # Collect PDF files
-    for ext in pdf_exts:
-        inputs.extend(input_dir.glob(f"*.{ext}"))
-    return sorted(set(inputs))
+    # One scandir pass with a suffix set replaces a directory walk per
+    # extension. scandir yields each entry once, so no dedup set is
+    # needed before sorting.
+    exts = {f".{e.lower()}" for e in image_exts} | {f".{e.lower()}" for e in pdf_exts}
+    inputs = [
+        pathlib.Path(entry.path)
+        for entry in os.scandir(input_dir)
+        if entry.is_file() and pathlib.Path(entry.name).suffix.lower() in exts
+    ]
+    inputs.sort()
+    return inputs
 
 
 def _filter_inputs(inputs: List[pathlib.Path], patterns: List[str]) -> List[pathlib.Path]:
@@ -143,14 +290,12 @@ def _filter_inputs(inputs: List[pathlib.Path], patterns: List[str]) -> List[path
     :return: Filtered list of input file paths
     """
     if not patterns:
-        return inputs    
-    filtered: List[pathlib.Path] = []
-    # Filter inputs based on patterns
-    for path in inputs:
-        name = path.name
-        if any(fnmatch.fnmatch(name, pat) for pat in patterns):
-            filtered.append(path)
-    return filtered
+        return inputs
+    # Translate every glob once and union them into a single compiled
+    # regex, so each filename is tested by one C-level match instead of
+    # re-translating each pattern per file inside fnmatch.
+    matcher = re.compile("|".join(fnmatch.translate(pat) for pat in patterns))
+    return [path for path in inputs if matcher.match(path.name)]
 
 
 def _render_progress(current: int, total: int, *, width: int = 30) -> str:
@@ -184,13 +329,15 @@ def _write_page_image(image: Image.Image, output_dir: pathlib.Path, doc_id: str,
     """
     output_dir.mkdir(parents=True, exist_ok=True)
     path = output_dir / f"{doc_id}_page_{page:03d}.png"
-    image.save(path)
+    # zlib level 1: the default level 6 spends most of its CPU shaving a
+    # few percent off files that only feed training, not archives.
+    image.save(path, format="PNG", compress_level=1, optimize=False)
     return path
 
 
 def _record_from_tokens(
     *,
-    image_path: pathlib.Path,
+    image_path: str,
     doc_id: str,
     page_idx: int,
     full_text: str,
@@ -208,7 +355,7 @@ def _record_from_tokens(
     labels: labels are used as identifiers for each token, default to "O"
     spans: spans are used for entity annotations, default to empty list
        
-    :param image_path: Path to the image file
+    :param image_path: Path string of the image file
     :param doc_id: Document identifier
     :param page_idx: Page index
     :param full_text: Full text extracted from the page
@@ -219,13 +366,15 @@ def _record_from_tokens(
     :return: Tuple of task and record dictionaries
     """
     # Create task dictionary
+    # task_id format: "{doc_id}::{page}::{image}"; double colons avoid
+    # conflicts with filenames
     task = {
         "data": {
             "text": full_text,
-            "image": str(image_path),
+            "image": image_path,
             "doc_id": doc_id,
             "page": page_idx,
-            "task_id": _task_key(doc_id, page_idx, str(image_path)), # unique task identifier in format "{doc_id}::{page}::{image}"
+            "task_id": f"{doc_id}::{page_idx}::{image_path}", # unique task identifier
         },
         "meta": {
             # Include OCR tokens and image size metadata
@@ -238,15 +387,22 @@ def _record_from_tokens(
         task["data"]["source_pdf"] = source_pdf
 
     # Create record dictionary for LayoutLM
+    # One pass over the tokens fills both columns; pages can carry
+    # thousands of tokens, so walking the list twice adds up.
+    texts: List[str] = []
+    bboxes: List[List[int]] = []
+    for t in tokens:
+        texts.append(t["text"])
+        bboxes.append(t["bbox"])
     record = {
         "id": None,
-        "image": str(image_path),
+        "image": image_path,
         "text": full_text,
         "doc_id": doc_id,
         "page": page_idx,
-        "tokens": [t["text"] for t in tokens], # token texts, tokens represent OCR tokens with text and bbox
-        "bboxes": [t["bbox"] for t in tokens], # bounding boxes for each token
-        "labels": ["O"] * len(tokens), # default labels for each token
+        "tokens": texts, # token texts, tokens represent OCR tokens with text and bbox
+        "bboxes": bboxes, # bounding boxes for each token
+        "labels": ["O"] * len(texts), # default labels for each token
         "spans": [], # default empty list for entity annotations
     }
     if source_pdf:
@@ -273,12 +429,36 @@ def main() -> None:
     # Tesseract page segmentation mode, default 6 (Assume a single uniform block of text)
     # see https://tesseract-ocr.github.io/tessdoc/ImproveQuality#page-segmentation-method
     parser.add_argument("--psm", type=int, default=6, help="Tesseract page segmentation mode")
+    # ocr-mode: pixel mode fed to Tesseract; "L" halves the bytes through
+    # OCR for scanned black-and-white documents
+    parser.add_argument(
+        "--ocr-mode",
+        choices=["RGB", "L"],
+        default="RGB",
+        help='Pixel mode for OCR ("L" for grayscale/B&W scans)',
+    )
+    # batch-tesseract: OCR image files in chunks through one tesseract
+    # invocation each, amortizing engine startup and model load; PDFs
+    # still go through the per-input path. Does not apply --ocr-mode
+    # (Tesseract reads the files directly).
+    parser.add_argument(
+        "--batch-tesseract",
+        action="store_true",
+        help="OCR image files via one tesseract invocation per chunk",
+    )
     # Write Label Studio-style tasks, if you want to use a labeling tool
     parser.add_argument("--write-tasks", action="store_true", help="Write Label Studio-style tasks")
     # tasks-format: format for writing tasks, either json or jsonl
     parser.add_argument("--tasks-format", choices=["json", "jsonl"], default="jsonl")
     # progress-bar: if set, render a simple progress bar
     parser.add_argument("--progress-bar", action="store_true", help="Render a simple progress bar")
+    # skip-page-images: skip writing PDF page PNGs entirely; records still
+    # carry the deterministic path they would have been written to
+    parser.add_argument(
+        "--skip-page-images",
+        action="store_true",
+        help="Do not write PDF page images to disk (records keep the path)",
+    )
     # ext: image file extensions to include
     # use if you have non-standard image extensions
     parser.add_argument(
@@ -301,6 +481,14 @@ def main() -> None:
         default=[],
         help="Filename glob to include (repeatable), e.g. '*2025_*.pdf'",
     )
+    # workers: OCR worker processes; Tesseract is compute-bound and each
+    # input is independent, so the pool scales close to linearly
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for OCR (1 disables the pool)",
+    )
     args = parser.parse_args()
 
     # Prepare output paths
@@ -313,10 +501,12 @@ def main() -> None:
     all_path = args.output_dir / "layoutlm.jsonl"
     train_path = args.output_dir / "layoutlm_train.jsonl"
     eval_path = args.output_dir / "layoutlm_eval.jsonl"
+    # Sidecar listing processed inputs, so --resume skips the JSONL scan.
+    proc_path = all_path.with_suffix(".processed.txt")
 
     # If not resuming, remove existing output files
     if not args.resume:
-        for path in (tasks_path, all_path, train_path, eval_path):
+        for path in (tasks_path, all_path, train_path, eval_path, proc_path):
             if path.exists():
                 path.unlink()
 
@@ -327,9 +517,13 @@ def main() -> None:
     if not inputs:
         raise SystemExit("No images or PDFs found.")
 
-    # Initialize random number generator for shuffling/splitting 
-    # eval-ratio determines fraction of data for eval set
-    rng = random.Random(args.seed)
+    # Initialize random number generator for shuffling/splitting
+    # eval-ratio determines fraction of data for eval set. Decisions are
+    # drawn 4096 at a time in vectorized C; the record count is not known
+    # upfront (PDFs yield one record per page), so the mask refills lazily.
+    split_rng = np.random.default_rng(args.seed)
+    eval_mask: List[bool] = []
+    mask_pos = 0
     total = 0
     train_count = 0
     eval_count = 0
@@ -338,102 +532,170 @@ def main() -> None:
     processed_inputs = 0
 
     # Process inputs in batches
-    tasks: List[Dict[str, object]] = []
-    with all_path.open("a", encoding="utf-8") as all_f, \
-         train_path.open("a", encoding="utf-8") as train_f, \
-         eval_path.open("a", encoding="utf-8") as eval_f:
-        for batch in _iter_batches(inputs, args.batch_size):
-            for input_path in batch:
-                if args.resume and str(input_path) in processed:
-                    continue
-
-                # Process PDF files
-                if input_path.suffix.lower() == ".pdf":
-                    pages = load_images_from_bytes(input_path.read_bytes(), dpi=300)
-                    doc_id = input_path.stem
-                    for page in pages:
-                        page_image_path = _write_page_image(
-                            page.image, args.output_dir / "images", doc_id, page.page
-                        )
-                        # Extract tokens and record from the page image
-                        full_text, tokens = _extract_tokens(page.image, lang=args.lang, psm=args.psm)
+    process_one = functools.partial(
+        _process_input,
+        lang=args.lang,
+        psm=args.psm,
+        images_dir=str(args.output_dir / "images"),
+        write_page_images=not args.skip_page_images,
+        ocr_mode=args.ocr_mode,
+    )
+    # OCR runs in worker processes; the parent does all serialization,
+    # writing, and RNG splitting so the output stays deterministic.
+    executor: Optional[ProcessPoolExecutor] = None
+    if args.workers > 1:
+        executor = ProcessPoolExecutor(max_workers=args.workers, initializer=_init_ocr_worker)
+    # The bar only makes sense on a terminal; piped output gets plain
+    # progress lines. Redraws are throttled so fast batches never stall
+    # on terminal I/O.
+    use_bar = args.progress_bar and sys.stdout.isatty()
+    last_draw = 0.0
+    # Encoded lines accumulate per output and flush in chunks through
+    # writelines, so each record costs a list append instead of a
+    # buffered-IO call per file.
+    all_buf: List[bytes] = []
+    train_buf: List[bytes] = []
+    eval_buf: List[bytes] = []
+    proc_buf: List[str] = []
+    # Tasks stream to disk as they are produced instead of accumulating in
+    # memory; the json format is written as a comma-joined array so it
+    # never needs the full task list either.
+    tasks_buf: List[bytes] = []
+    task_count = 0
+    tasks_f = None
+    if args.write_tasks:
+        tasks_f = tasks_path.open("wb", buffering=1 << 20)
+        if args.tasks_format == "json":
+            tasks_buf.append(b"[\n")
+    try:
+        with all_path.open("ab", buffering=1 << 20) as all_f, \
+             train_path.open("ab", buffering=1 << 20) as train_f, \
+             eval_path.open("ab", buffering=1 << 20) as eval_f, \
+             proc_path.open("a", encoding="utf-8") as proc_f:
+            for batch in _iter_batches(inputs, args.batch_size):
+                pending = [
+                    str(p) for p in batch
+                    if not (args.resume and hash(str(p)) in processed)
+                ]
+                if args.batch_tesseract:
+                    # Route image files through chunked batch OCR and PDFs
+                    # through the per-input path, then reassemble results
+                    # in pending order so the split stays deterministic.
+                    pdf_suffixes = {f".{e.lower()}" for e in args.pdf_ext}
+                    pdfs = [p for p in pending if pathlib.Path(p).suffix.lower() in pdf_suffixes]
+                    imgs = [p for p in pending if pathlib.Path(p).suffix.lower() not in pdf_suffixes]
+                    chunks = [imgs[i : i + 32] for i in range(0, len(imgs), 32)]
+                    batch_one = functools.partial(_process_image_list, lang=args.lang, psm=args.psm)
+                    if executor is not None:
+                        chunk_lists = executor.map(batch_one, chunks)
+                        pdf_lists = executor.map(process_one, pdfs)
+                    else:
+                        chunk_lists = map(batch_one, chunks)
+                        pdf_lists = map(process_one, pdfs)
+                    by_path: Dict[str, List[Dict[str, object]]] = {}
+                    for chunk, chunk_results in zip(chunks, chunk_lists):
+                        by_path.update(zip(chunk, chunk_results))
+                    by_path.update(zip(pdfs, pdf_lists))
+                    page_lists = (by_path[p] for p in pending)
+                elif executor is not None:
+                    # map preserves input order, keeping the split stable.
+                    page_lists = executor.map(process_one, pending, chunksize=4)
+                else:
+                    page_lists = map(process_one, pending)
+                for page_results in page_lists:
+                    for info in page_results:
                         task, record = _record_from_tokens(
-                            image_path=page_image_path,
-                            doc_id=doc_id,
-                            page_idx=page.page,
-                            full_text=full_text,
-                            tokens=tokens,
-                            width=page.width,
-                            height=page.height,
-                            source_pdf=str(input_path),
+                            image_path=info["image_path"],
+                            doc_id=info["doc_id"],
+                            page_idx=info["page_idx"],
+                            full_text=info["full_text"],
+                            tokens=info["tokens"],
+                            width=info["width"],
+                            height=info["height"],
+                            source_pdf=info["source_pdf"],
                         )
                         # all_f is the combined JSONL file
-                        if args.write_tasks:
-                            tasks.append(task)
-                        all_f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                        if tasks_f is not None:
+                            if args.tasks_format == "json":
+                                if task_count:
+                                    tasks_buf.append(b",\n")
+                                tasks_buf.append(_dumps(task))
+                            else:
+                                tasks_buf.append(_dump_line(task))
+                            task_count += 1
+                        dumped = _dump_line(record)
+                        all_buf.append(dumped)
+                        proc_buf.append(info["image_path"] + "\n")
+                        if info["source_pdf"]:
+                            proc_buf.append(info["source_pdf"] + "\n")
                         # Split into train/eval based on eval_ratio
-                        if rng.random() < args.eval_ratio:
-                            eval_f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                        if mask_pos == len(eval_mask):
+                            eval_mask = (split_rng.random(4096) < args.eval_ratio).tolist()
+                            mask_pos = 0
+                        is_eval = eval_mask[mask_pos]
+                        mask_pos += 1
+                        if is_eval:
+                            eval_buf.append(dumped)
                             eval_count += 1
                         else:
-                            train_f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                            train_buf.append(dumped)
                             train_count += 1
                         total += 1
                     processed_inputs += 1
-
-                # Process image files
-                else:
-                    # preprocess image
-                    with Image.open(input_path) as im:
-                        image = im.convert("RGB")
-                        width, height = image.size
-                    # Extract tokens and record from the image
-                    full_text, tokens = _extract_tokens(image, lang=args.lang, psm=args.psm)
-                    doc_id = input_path.stem
-                    page_idx = 1
-                    task, record = _record_from_tokens(
-                        image_path=input_path,
-                        doc_id=doc_id,
-                        page_idx=page_idx,
-                        full_text=full_text,
-                        tokens=tokens,
-                        width=width,
-                        height=height,
-                    )
-                    # all_f is the combined JSONL file
-                    # split into train/eval based on eval_ratio
-                    if args.write_tasks:
-                        tasks.append(task)
-                    all_f.write(json.dumps(record, ensure_ascii=False) + "\n")
-                    if rng.random() < args.eval_ratio:
-                        eval_f.write(json.dumps(record, ensure_ascii=False) + "\n")
-                        eval_count += 1
+                    if len(all_buf) >= 1000:
+                        all_f.writelines(all_buf)
+                        all_buf.clear()
+                        train_f.writelines(train_buf)
+                        train_buf.clear()
+                        eval_f.writelines(eval_buf)
+                        eval_buf.clear()
+                        proc_f.writelines(proc_buf)
+                        proc_buf.clear()
+                        if tasks_f is not None:
+                            tasks_f.writelines(tasks_buf)
+                            tasks_buf.clear()
+
+                # Update progress at most every 0.2s; the final state is
+                # always printed after the loop.
+                now = time.monotonic()
+                if now - last_draw >= 0.2:
+                    last_draw = now
+                    if use_bar:
+                        bar = _render_progress(processed_inputs, total_inputs)
+                        sys.stdout.write(f"\r{bar} records={total}")
+                        sys.stdout.flush()
+                    elif total_inputs > 0:
+                        pct = (processed_inputs / total_inputs) * 100
+                        print(f"Progress: {processed_inputs}/{total_inputs} inputs ({pct:.1f}%), records={total}")
                     else:
-                        train_f.write(json.dumps(record, ensure_ascii=False) + "\n")
-                        train_count += 1
-                    total += 1
-                    processed_inputs += 1
-
-            # Update progress
-            if args.progress_bar:
-                bar = _render_progress(processed_inputs, total_inputs)
-                sys.stdout.write(f"\r{bar} records={total}")
-                sys.stdout.flush()
-            else:
-                if total_inputs > 0:
-                    pct = (processed_inputs / total_inputs) * 100
-                    print(f"Progress: {processed_inputs}/{total_inputs} inputs ({pct:.1f}%), records={total}")
-                else:
-                    print(f"Processed batch of {len(batch)} inputs (records={total})")
-
-    if args.progress_bar:
-        sys.stdout.write("\n")
+                        print(f"Processed batch of {len(batch)} inputs (records={total})")
+
+            # Flush residual records.
+            all_f.writelines(all_buf)
+            train_f.writelines(train_buf)
+            eval_f.writelines(eval_buf)
+            proc_f.writelines(proc_buf)
+            if tasks_f is not None:
+                if args.tasks_format == "json":
+                    tasks_buf.append(b"\n]\n")
+                tasks_f.writelines(tasks_buf)
+    finally:
+        if tasks_f is not None:
+            tasks_f.close()
+        if executor is not None:
+            executor.shutdown()
+
+    if use_bar:
+        bar = _render_progress(processed_inputs, total_inputs)
+        sys.stdout.write(f"\r{bar} records={total}\n")
         sys.stdout.flush() # flush is needed to ensure the newline is printed after the progress bar
+    elif total_inputs > 0:
+        pct = (processed_inputs / total_inputs) * 100
+        print(f"Progress: {processed_inputs}/{total_inputs} inputs ({pct:.1f}%), records={total}")
 
     # Inform user of output files written
     if args.write_tasks:
-        _write_tasks(tasks_path, tasks, args.tasks_format)
-        print(f"Wrote {len(tasks)} tasks to {tasks_path}")
+        print(f"Wrote {task_count} tasks to {tasks_path}")
     print(f"Wrote {total} records to {all_path}")
     print(f"Wrote {train_count} train records to {train_path}")
     print(f"Wrote {eval_count} eval records to {eval_path}")
@@ -3,94 +3,241 @@
 from __future__ import annotations
 
 import argparse
+import functools
+import hashlib
 import json
+import os
 import sys
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
+
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from caesar_ocr.pipeline.analyze import analyze_document_bytes
 from caesar_ocr.ocr.engine import detect_mrz_lines_from_text
+from caesar_ocr.layoutlm.infer import warm_layoutlm_model
+from caesar_ocr.layoutlm.token_infer import warm_token_model
+
+# orjson parses a line several times faster than stdlib json; fall back
+# when it is not installed.
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+_loads = orjson.loads if orjson is not None else json.loads
 
+if orjson is not None:
 
-@dataclass
-class FieldStats:
-    tp: int = 0
-    fp: int = 0
-    fn: int = 0
+    def _dump_line(record: Dict[str, Any]) -> bytes:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
 
-    def precision(self) -> float:
-        return self.tp / (self.tp + self.fp) if (self.tp + self.fp) else 0.0
+else:
 
-    def recall(self) -> float:
-        return self.tp / (self.tp + self.fn) if (self.tp + self.fn) else 0.0
+    def _dump_line(record: Dict[str, Any]) -> bytes:
+        return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
 
-    def f1(self) -> float:
-        p = self.precision()
-        r = self.recall()
-        return (2 * p * r / (p + r)) if (p + r) else 0.0
 
+# Per-field counts are a plain [tp, fp, fn] triple; precision/recall/F1
+# are computed for all fields at once in _summarize.
+_TP, _FP, _FN = 0, 1, 2
 
-_CASE_INSENSITIVE_FIELDS = {
+
+def _summarize(stats: Dict[str, List[int]]) -> Dict[str, Dict[str, float]]:
+    if not stats:
+        return {}
+    fields = sorted(stats)
+    counts = np.array([stats[f] for f in fields], dtype=np.int64)
+    tp, fp, fn = counts[:, _TP], counts[:, _FP], counts[:, _FN]
+    precision = tp / np.maximum(tp + fp, 1)
+    recall = tp / np.maximum(tp + fn, 1)
+    f1 = 2 * precision * recall / np.maximum(precision + recall, 1e-12)
+    return {
+        field: {
+            "tp": int(t),
+            "fp": int(p_fp),
+            "fn": int(p_fn),
+            "precision": float(p),
+            "recall": float(r),
+            "f1": float(f),
+        }
+        for field, t, p_fp, p_fn, p, r, f in zip(fields, tp, fp, fn, precision, recall, f1)
+    }
+
+
+_CASE_INSENSITIVE_FIELDS = frozenset({
     "given_names",
     "surname",
     "holder_name_guess",
     "institution_guess",
     "program_guess",
     "degree_type_guess",
-}
-_IGNORE_UNEXPECTED_FIELDS = {"document_code", "dates_detected"}
+})
+_IGNORE_UNEXPECTED_FIELDS = frozenset({"document_code", "dates_detected"})
+
+
+# Expected values repeat across the whole manifest and predictions repeat
+# common strings, so the per-string work is memoized.
+@functools.lru_cache(maxsize=65536)
+def _norm_one(value: str, lower: bool) -> str:
+    value = " ".join(value.split())
+    return value.lower() if lower else value
 
 
 def _normalize_value(value: Any, *, field: Optional[str] = None) -> List[str]:
     if value is None:
         return []
-    if isinstance(value, list):
-        values = [str(v).strip() for v in value if str(v).strip()]
-    else:
-        values = [str(value).strip()] if str(value).strip() else []
-    values = [" ".join(v.split()) for v in values]
-    if field in _CASE_INSENSITIVE_FIELDS:
-        return [v.lower() for v in values]
-    return values
+    lower = field in _CASE_INSENSITIVE_FIELDS
+    if not isinstance(value, list):
+        value = [value]
+    out = []
+    for v in value:
+        normalized = _norm_one(str(v), lower)
+        if normalized:
+            out.append(normalized)
+    return out
 
 
 def _values_match(expected: Any, predicted: Any, *, field: Optional[str] = None) -> bool:
     expected_vals = _normalize_value(expected, field=field)
-    predicted_vals = _normalize_value(predicted, field=field)
     if not expected_vals:
         return False
+    predicted_vals = _normalize_value(predicted, field=field)
     if not predicted_vals:
         return False
-    return bool(set(expected_vals) & set(predicted_vals))
+    # Field values are usually one or two strings; probing the larger side
+    # directly beats hashing both lists into sets just to intersect them.
+    if len(expected_vals) <= len(predicted_vals):
+        small, large = expected_vals, predicted_vals
+    else:
+        small, large = predicted_vals, expected_vals
+    if len(large) > 2:
+        large = set(large)
+    return any(v in large for v in small)
 
 
 def _iter_manifest(path: Path) -> Iterable[Dict[str, Any]]:
-    for line in path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        yield json.loads(line)
+    # Stream line by line; read_text + splitlines would hold the whole
+    # manifest plus a list of every line in memory at once.
+    with path.open("rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            yield _loads(line)
+
+
+_CACHE_DIR = Path(os.path.expanduser("~/.cache/caesar_ocr/eval"))
+
+
+def _warm_models(layoutlm_model_dir: Optional[str], layoutlm_token_model_dir: Optional[str]) -> None:
+    # Pool initializer: from_pretrained runs once per worker at startup
+    # and populates the lru_caches, so no document waits on a model load.
+    if layoutlm_model_dir:
+        warm_layoutlm_model(layoutlm_model_dir)
+    if layoutlm_token_model_dir:
+        warm_token_model(layoutlm_token_model_dir)
+
 
+def _process_item(
+    item: Dict[str, Any],
+    *,
+    layoutlm_model_dir: Optional[str],
+    layoutlm_token_model_dir: Optional[str],
+    lang: str,
+    layoutlm_lang: Optional[str],
+    regex_rules_path: Optional[str],
+    regex_debug: bool,
+    include_ocr_text: bool,
+    ocr_text_max_len: int,
+    include_mrz_lines: bool,
+    use_cache: bool,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    # Runs in a worker process; models load once per worker through the
+    # lru_cache in TokenInferer.from_model_dir. Returns (expected, row)
+    # so the parent can merge stats and keep output ordering.
+    path = Path(item["path"])
+    expected = item.get("expected", {})
+    payload = path.read_bytes()
+
+    # Content-addressed cache: rerunning over the same documents (or a
+    # manifest with duplicates) skips OCR+LayoutLM entirely. The analysis
+    # settings are folded into the key so changing models, language, or
+    # rules path misses cleanly; edits inside a model or rules file with
+    # the same path still require --no-cache.
+    cached: Optional[Dict[str, Any]] = None
+    cache_path: Optional[Path] = None
+    if use_cache:
+        settings = (
+            f"{layoutlm_model_dir}|{layoutlm_token_model_dir}|{lang}"
+            f"|{layoutlm_lang}|{regex_rules_path}|{regex_debug}"
+        )
+        key = hashlib.blake2b(payload + settings.encode("utf-8"), digest_size=16).hexdigest()
+        cache_path = _CACHE_DIR / f"{key}.json"
+        # Best-effort read: a corrupt or torn entry falls back to
+        # recomputing (and rewriting) instead of failing the whole eval.
+        try:
+            cached = _loads(cache_path.read_bytes())
+        except (OSError, ValueError):
+            cached = None
+
+    if cached is None:
+        result = analyze_document_bytes(
+            payload,
+            layoutlm_model_dir=layoutlm_model_dir,
+            lang=lang,
+            layoutlm_lang=layoutlm_lang,
+            regex_rules_path=regex_rules_path,
+            regex_debug=regex_debug,
+            layoutlm_token_model_dir=layoutlm_token_model_dir,
+        )
+        cached = {
+            "fields": result.ocr.fields,
+            "doc_type": result.ocr.doc_type,
+            "ocr_text": result.ocr.ocr_text or "",
+        }
+        if cache_path is not None:
+            # Write-to-temp + rename keeps the entry atomic: duplicate
+            # manifest items can land on the same key from two workers,
+            # and a torn write must never poison later runs.
+            _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(_dump_line(cached))
+            os.replace(tmp, cache_path)
+
+    row = {
+        "path": str(path),
+        "expected": expected,
+        "predicted": cached["fields"],
+        "doc_type": cached["doc_type"],
+    }
+    if include_ocr_text:
+        text = cached["ocr_text"]
+        if ocr_text_max_len and len(text) > ocr_text_max_len:
+            text = text[:ocr_text_max_len]
+        row["ocr_text"] = text
+    if include_mrz_lines:
+        row["mrz_lines_detected"] = detect_mrz_lines_from_text(cached["ocr_text"])
+    return expected, row
 
-def _eval_fields(expected: Dict[str, Any], predicted: Dict[str, Any], stats: Dict[str, FieldStats]) -> None:
-    expected_fields = set(expected.keys())
-    predicted_fields = {k for k in predicted.keys() if k not in _IGNORE_UNEXPECTED_FIELDS}
 
-    for field in expected_fields:
-        stat = stats.setdefault(field, FieldStats())
+def _eval_fields(expected: Dict[str, Any], predicted: Dict[str, Any], stats: Dict[str, List[int]]) -> None:
+    for field in expected:
+        stat = stats.setdefault(field, [0, 0, 0])
         if _values_match(expected.get(field), predicted.get(field), field=field):
-            stat.tp += 1
+            stat[_TP] += 1
         else:
-            stat.fn += 1
+            stat[_FN] += 1
 
-    for field in predicted_fields - expected_fields:
-        stat = stats.setdefault(field, FieldStats())
-        stat.fp += 1
+    # dict key views support set difference directly, so no intermediate
+    # sets are built per document.
+    for field in predicted.keys() - expected.keys() - _IGNORE_UNEXPECTED_FIELDS:
+        stat = stats.setdefault(field, [0, 0, 0])
+        stat[_FP] += 1
 
 
 def main() -> None:
@@ -106,57 +253,66 @@ def main() -> None:
     parser.add_argument("--include-ocr-text", action="store_true", help="Include OCR text in per-doc output")
     parser.add_argument("--ocr-text-max-len", type=int, default=2000, help="Max OCR text length to store")
     parser.add_argument("--include-mrz-lines", action="store_true", help="Include MRZ lines detected from OCR text")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for document analysis (1 disables the pool)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Rerun analysis even when a cached result exists under ~/.cache/caesar_ocr/eval",
+    )
     args = parser.parse_args()
 
-    stats: Dict[str, FieldStats] = {}
-    per_doc_rows: List[Dict[str, Any]] = []
+    stats: Dict[str, List[int]] = {}
 
-    for item in _iter_manifest(args.manifest):
-        path = Path(item["path"])
-        expected = item.get("expected", {})
-        payload = path.read_bytes()
-        result = analyze_document_bytes(
-            payload,
-            layoutlm_model_dir=args.layoutlm_model_dir,
-            lang=args.lang,
-            layoutlm_lang=args.layoutlm_lang,
-            regex_rules_path=args.regex_rules,
-            regex_debug=args.regex_debug,
-            layoutlm_token_model_dir=args.layoutlm_token_model_dir,
+    process_one = functools.partial(
+        _process_item,
+        layoutlm_model_dir=args.layoutlm_model_dir,
+        layoutlm_token_model_dir=args.layoutlm_token_model_dir,
+        lang=args.lang,
+        layoutlm_lang=args.layoutlm_lang,
+        regex_rules_path=args.regex_rules,
+        regex_debug=args.regex_debug,
+        include_ocr_text=args.include_ocr_text,
+        ocr_text_max_len=args.ocr_text_max_len,
+        include_mrz_lines=args.include_mrz_lines,
+        use_cache=not args.no_cache,
+    )
+    # Documents are independent and OCR-bound, so they fan out across a
+    # process pool; map preserves manifest order and the parent merges the
+    # additive tp/fp/fn counts.
+    executor: Optional[ProcessPoolExecutor] = None
+    if args.workers > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=_warm_models,
+            initargs=(args.layoutlm_model_dir, args.layoutlm_token_model_dir),
         )
-        predicted_fields = result.ocr.fields
-        _eval_fields(expected, predicted_fields, stats)
-
-        row = {
-            "path": str(path),
-            "expected": expected,
-            "predicted": predicted_fields,
-            "doc_type": result.ocr.doc_type,
-        }
-        if args.include_ocr_text:
-            text = result.ocr.ocr_text or ""
-            if args.ocr_text_max_len and len(text) > args.ocr_text_max_len:
-                text = text[: args.ocr_text_max_len]
-            row["ocr_text"] = text
-        if args.include_mrz_lines:
-            row["mrz_lines_detected"] = detect_mrz_lines_from_text(result.ocr.ocr_text or "")
-        per_doc_rows.append(row)
-
-    summary = {}
-    for field, stat in sorted(stats.items()):
-        summary[field] = {
-            "tp": stat.tp,
-            "fp": stat.fp,
-            "fn": stat.fn,
-            "precision": stat.precision(),
-            "recall": stat.recall(),
-            "f1": stat.f1(),
-        }
-
-    print(json.dumps({"summary": summary}, indent=2))
+    else:
+        _warm_models(args.layoutlm_model_dir, args.layoutlm_token_model_dir)
+    # Per-doc rows stream to disk as results arrive instead of piling up
+    # in a list until the end; with --include-ocr-text that list could be
+    # hundreds of MB, and streaming also checkpoints progress.
+    out_f = args.output.open("wb", buffering=1 << 20) if args.output else None
+    try:
+        if executor is not None:
+            results = executor.map(process_one, _iter_manifest(args.manifest))
+        else:
+            results = map(process_one, _iter_manifest(args.manifest))
+        for expected, row in results:
+            _eval_fields(expected, row["predicted"], stats)
+            if out_f is not None:
+                out_f.write(_dump_line(row))
+    finally:
+        if out_f is not None:
+            out_f.close()
+        if executor is not None:
+            executor.shutdown()
 
-    if args.output:
-        args.output.write_text("\n".join(json.dumps(row) for row in per_doc_rows) + "\n", encoding="utf-8")
+    print(json.dumps({"summary": _summarize(stats)}, indent=2))
 
 
 if __name__ == "__main__":
@@ -3,13 +3,15 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
 import json
 import sys
 from collections import defaultdict
-from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, Iterable, List, Tuple
 
+import numpy as np
+import torch
 from PIL import Image
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -18,42 +20,90 @@ if str(ROOT) not in sys.path:
 
 from caesar_ocr.layoutlm.token_infer import TokenInferer
 
+# Use the faster C JSON parser when available.
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
 
-@dataclass
-class LabelStats:
-    tp: int = 0
-    fp: int = 0
-    fn: int = 0
+_loads = orjson.loads if orjson is not None else json.loads
 
-    def precision(self) -> float:
-        return self.tp / (self.tp + self.fp) if (self.tp + self.fp) else 0.0
+if orjson is not None:
 
-    def recall(self) -> float:
-        return self.tp / (self.tp + self.fn) if (self.tp + self.fn) else 0.0
+    def _dump_line(record: Dict) -> bytes:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
 
-    def f1(self) -> float:
-        p = self.precision()
-        r = self.recall()
-        return (2 * p * r / (p + r)) if (p + r) else 0.0
+else:
 
+    def _dump_line(record: Dict) -> bytes:
+        return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
 
-def _iter_jsonl(path: Path) -> Iterable[Dict]:
-    for line in path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        yield json.loads(line)
+
+# Per-label counts are a plain [tp, fp, fn] triple; all metrics are
+# computed at once over the BIO vocabulary in _summarize.
+_TP, _FP, _FN = 0, 1, 2
+
+
+def _summarize(stats: Dict[str, List[int]]) -> Dict[str, Dict[str, float]]:
+    if not stats:
+        return {}
+    labels = sorted(stats)
+    counts = np.array([stats[label] for label in labels], dtype=np.int64)
+    tp, fp, fn = counts[:, _TP], counts[:, _FP], counts[:, _FN]
+    precision = tp / np.maximum(tp + fp, 1)
+    recall = tp / np.maximum(tp + fn, 1)
+    f1 = 2 * precision * recall / np.maximum(precision + recall, 1e-12)
+    return {
+        label: {
+            "tp": int(t),
+            "fp": int(c_fp),
+            "fn": int(c_fn),
+            "precision": float(p),
+            "recall": float(r),
+            "f1": float(f),
+        }
+        for label, t, c_fp, c_fn, p, r, f in zip(labels, tp, fp, fn, precision, recall, f1)
+    }
 
 
-def _update_stats(stats: Dict[str, LabelStats], gold: str, pred: str) -> None:
-    if gold == pred:
-        if gold != "O":
-            stats[gold].tp += 1
+def _iter_jsonl(path: Path) -> Iterable[Dict]:
+    # Stream one line at a time instead of materializing the file and a
+    # list of its lines; labeled JSONL can run to gigabytes.
+    with path.open("rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            yield _loads(line)
+
+
+def _update_page_stats(stats: Dict[str, List[int]], gold_labels: List[str], pred_labels: List[str]) -> None:
+    """Fold one page's gold/pred label pairs into the counts.
+
+    Both sequences are integer-encoded once and the tp/fp/fn updates
+    happen as three vectorized scatters, replacing a Python-level
+    comparison per token. "O" never counts toward any bucket, matching
+    the old per-token rules.
+    """
+    if not gold_labels:
         return
-    if pred != "O":
-        stats[pred].fp += 1
-    if gold != "O":
-        stats[gold].fn += 1
+    uniq, codes = np.unique(np.array(gold_labels + pred_labels), return_inverse=True)
+    n = len(gold_labels)
+    gold_arr, pred_arr = codes[:n], codes[n:]
+    o_pos = np.searchsorted(uniq, "O")
+    o_code = o_pos if o_pos < uniq.size and uniq[o_pos] == "O" else -1
+
+    match = gold_arr == pred_arr
+    counts = np.zeros((uniq.size, 3), dtype=np.int64)
+    np.add.at(counts[:, _TP], gold_arr[match & (gold_arr != o_code)], 1)
+    np.add.at(counts[:, _FP], pred_arr[~match & (pred_arr != o_code)], 1)
+    np.add.at(counts[:, _FN], gold_arr[~match & (gold_arr != o_code)], 1)
+
+    for label, row in zip(uniq, counts):
+        if row.any():
+            stat = stats[str(label)]
+            stat[_TP] += int(row[_TP])
+            stat[_FP] += int(row[_FP])
+            stat[_FN] += int(row[_FN])
 
 
 def main() -> None:
@@ -62,61 +112,79 @@ def main() -> None:
     parser.add_argument("--model-dir", required=True, help="LayoutLM token model directory")
     parser.add_argument("--limit", type=int, default=None, help="Limit number of pages")
     parser.add_argument("--output", type=Path, default=None, help="Write per-page predictions JSONL")
+    parser.add_argument("--batch-size", type=int, default=8, help="Pages per model forward pass")
     args = parser.parse_args()
 
     inferer = TokenInferer.from_model_dir(args.model_dir)
-    stats: Dict[str, LabelStats] = defaultdict(LabelStats)
+    stats: Dict[str, List[int]] = defaultdict(lambda: [0, 0, 0])
     total_tokens = 0
     per_page_rows = []
 
-    for idx, item in enumerate(_iter_jsonl(args.input)):
-        if args.limit is not None and idx >= args.limit:
-            break
-        image_path = Path(item["image"])
-        tokens: List[str] = item.get("tokens", [])
-        bboxes: List[List[int]] = item.get("bboxes", [])
-        gold_labels: List[str] = item.get("labels", [])
-        if not image_path.exists():
-            raise FileNotFoundError(f"Missing image: {image_path}")
-        if not (len(tokens) == len(bboxes) == len(gold_labels)):
-            raise ValueError(f"Token/box/label length mismatch for {image_path}")
-
-        image = Image.open(image_path).convert("RGB")
-        pred_labels, _ = inferer.infer(image, tokens, bboxes)
-        if len(pred_labels) != len(gold_labels):
-            raise ValueError(f"Prediction length mismatch for {image_path}")
-
-        for gold, pred in zip(gold_labels, pred_labels):
-            _update_stats(stats, gold, pred)
-        total_tokens += len(gold_labels)
-
-        if args.output:
-            per_page_rows.append(
-                {
-                    "doc_id": item.get("doc_id"),
-                    "page": item.get("page"),
-                    "image": str(image_path),
-                    "tokens": tokens,
-                    "gold_labels": gold_labels,
-                    "pred_labels": pred_labels,
-                }
-            )
-
-    summary = {}
-    for label, stat in sorted(stats.items()):
-        summary[label] = {
-            "tp": stat.tp,
-            "fp": stat.fp,
-            "fn": stat.fn,
-            "precision": stat.precision(),
-            "recall": stat.recall(),
-            "f1": stat.f1(),
-        }
-
-    print(json.dumps({"total_tokens": total_tokens, "summary": summary}, indent=2))
+    # Pages buffer up to --batch-size and go through one forward pass via
+    # infer_batch, amortizing per-call model overhead.
+    batch: List[Tuple[Dict, Image.Image, List[str], List[List[int]], List[str]]] = []
+
+    def _flush_batch() -> None:
+        nonlocal total_tokens
+        if not batch:
+            return
+        predictions = inferer.infer_batch(
+            [b[1] for b in batch], [b[2] for b in batch], [b[3] for b in batch]
+        )
+        for (item, _image, tokens, _bboxes, gold_labels), (pred_labels, _) in zip(batch, predictions):
+            if len(pred_labels) != len(gold_labels):
+                raise ValueError(f"Prediction length mismatch for {item['image']}")
+            _update_page_stats(stats, gold_labels, pred_labels)
+            total_tokens += len(gold_labels)
+            if args.output:
+                per_page_rows.append(
+                    {
+                        "doc_id": item.get("doc_id"),
+                        "page": item.get("page"),
+                        "image": item["image"],
+                        "tokens": tokens,
+                        "gold_labels": gold_labels,
+                        "pred_labels": pred_labels,
+                    }
+                )
+        batch.clear()
+
+    # Pure inference: inference_mode drops autograd bookkeeping entirely,
+    # and on a GPU the forward passes run under bf16 autocast with TF32
+    # matmuls enabled. CPU runs keep full fp32.
+    if torch.cuda.is_available():
+        torch.backends.cuda.matmul.allow_tf32 = True
+        autocast = torch.autocast(device_type="cuda", dtype=torch.bfloat16)
+    else:
+        autocast = contextlib.nullcontext()
+
+    with torch.inference_mode(), autocast:
+        for idx, item in enumerate(_iter_jsonl(args.input)):
+            if args.limit is not None and idx >= args.limit:
+                break
+            image_path = Path(item["image"])
+            tokens: List[str] = item.get("tokens", [])
+            bboxes: List[List[int]] = item.get("bboxes", [])
+            gold_labels: List[str] = item.get("labels", [])
+            if not image_path.exists():
+                raise FileNotFoundError(f"Missing image: {image_path}")
+            if not (len(tokens) == len(bboxes) == len(gold_labels)):
+                raise ValueError(f"Token/box/label length mismatch for {image_path}")
+
+            image = Image.open(image_path).convert("RGB")
+            batch.append((item, image, tokens, bboxes, gold_labels))
+            if len(batch) >= args.batch_size:
+                _flush_batch()
+
+        _flush_batch()
+
+    print(json.dumps({"total_tokens": total_tokens, "summary": _summarize(stats)}, indent=2))
 
     if args.output:
-        args.output.write_text("\n".join(json.dumps(r) for r in per_page_rows) + "\n", encoding="utf-8")
+        # Per-row buffered writes keep peak memory at one encoded row.
+        with args.output.open("wb", buffering=1 << 20) as f:
+            for row in per_page_rows:
+                f.write(_dump_line(row))
 
 
 if __name__ == "__main__":
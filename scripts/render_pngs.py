@@ -3,14 +3,33 @@
 from __future__ import annotations
 
 import argparse
+import functools
+import os
 import pathlib
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
 
 from pdf2image import convert_from_path
 
 
-def _chunk(items: List[pathlib.Path], size: int) -> List[List[pathlib.Path]]:
-    return [items[i : i + size] for i in range(0, len(items), size)]
+def _render_one(pdf_path_str: str, *, output_dir: str, dpi: int, max_pages: Optional[int]) -> int:
+    """Render one PDF to per-page PNGs; returns the page count written.
+
+    Runs in a worker process. thread_count=1 keeps each poppler instance
+    single-threaded so the pool owns the parallelism, and max_pages is
+    passed through as last_page so unwanted pages are never rasterized.
+    """
+    pdf_path = pathlib.Path(pdf_path_str)
+    pages = convert_from_path(
+        str(pdf_path), dpi=dpi, last_page=max_pages, thread_count=1
+    )
+    out_dir = pathlib.Path(output_dir)
+    for idx, page in enumerate(pages, start=1):
+        image_path = out_dir / f"{pdf_path.stem}_p{idx:03d}.png"
+        # zlib level 1: these PNGs feed OCR, not long-term storage, and
+        # the default level 6 can spend longer in libpng than in poppler.
+        page.save(image_path, format="PNG", compress_level=1, optimize=False)
+    return len(pages)
 
 
 def main() -> None:
@@ -18,8 +37,16 @@ def main() -> None:
     parser.add_argument("--input-dir", type=pathlib.Path, required=True)
     parser.add_argument("--output-dir", type=pathlib.Path, required=True)
     parser.add_argument("--dpi", type=int, default=300)
-    parser.add_argument("--batch-size", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=5, help="PDFs between progress lines")
     parser.add_argument("--max-pages", type=int, default=None)
+    # workers: PDFs render independently and pdftoppm is single-threaded
+    # per process, so the pool scales close to linearly
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for rendering (1 disables the pool)",
+    )
     args = parser.parse_args()
 
     args.output_dir.mkdir(parents=True, exist_ok=True)
@@ -27,16 +54,31 @@ def main() -> None:
     if not pdfs:
         raise SystemExit("No PDFs found.")
 
-    for batch in _chunk(pdfs, args.batch_size):
-        for pdf_path in batch:
-            pages = convert_from_path(str(pdf_path), dpi=args.dpi)
-            if args.max_pages is not None:
-                pages = pages[: args.max_pages]
-            for idx, page in enumerate(pages, start=1):
-                image_name = f"{pdf_path.stem}_p{idx:03d}.png"
-                image_path = args.output_dir / image_name
-                page.save(image_path)
-        print(f"Rendered batch of {len(batch)} PDFs")
+    render_one = functools.partial(
+        _render_one,
+        output_dir=str(args.output_dir),
+        dpi=args.dpi,
+        max_pages=args.max_pages,
+    )
+    executor: Optional[ProcessPoolExecutor] = None
+    if args.workers > 1:
+        executor = ProcessPoolExecutor(max_workers=args.workers)
+    # One continuous map keeps every worker busy; the old batching only
+    # gated the progress print, stalling the pool at each batch boundary.
+    paths = [str(p) for p in pdfs]
+    try:
+        if executor is not None:
+            results = executor.map(render_one, paths)
+        else:
+            results = map(render_one, paths)
+        done = 0
+        for _pages in results:
+            done += 1
+            if done % args.batch_size == 0 or done == len(paths):
+                print(f"Rendered {done}/{len(paths)} PDFs")
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
 
 if __name__ == "__main__":
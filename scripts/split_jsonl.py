@@ -1,16 +1,19 @@
 import argparse
-import json
 import pathlib
 import random
-from typing import List, Dict
+from typing import List
 
 
-def _read_jsonl(path: pathlib.Path) -> List[Dict[str, object]]:
-    return [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
-
-
-def _write_jsonl(path: pathlib.Path, records: List[Dict[str, object]]) -> None:
-    path.write_text("\n".join(json.dumps(rec, ensure_ascii=True) for rec in records))
+def _index_lines(path: pathlib.Path) -> List[int]:
+    """Return the byte offset of every non-blank line."""
+    offsets: List[int] = []
+    pos = 0
+    with path.open("rb") as f:
+        for line in f:
+            if line.strip():
+                offsets.append(pos)
+            pos += len(line)
+    return offsets
 
 
 def main() -> None:
@@ -22,24 +25,32 @@ def main() -> None:
     parser.add_argument("--seed", type=int, default=42)
     args = parser.parse_args()
 
-    records = _read_jsonl(args.input)
-    if not records:
+    # Index the input instead of loading it: the split only needs to know
+    # where each record starts, so peak memory is one offset per line and
+    # records are copied byte-for-byte with no JSON parse/serialize
+    # round-trip.
+    offsets = _index_lines(args.input)
+    if not offsets:
         raise SystemExit("No records found in input JSONL")
 
-    random.seed(args.seed)
-    random.shuffle(records)
-
-    val_count = max(1, int(len(records) * args.val_ratio))
-    val_records = records[:val_count]
-    train_records = records[val_count:]
+    val_count = max(1, int(len(offsets) * args.val_ratio))
+    val_indices = set(random.Random(args.seed).sample(range(len(offsets)), val_count))
 
     args.train.parent.mkdir(parents=True, exist_ok=True)
     args.val.parent.mkdir(parents=True, exist_ok=True)
-    _write_jsonl(args.train, train_records)
-    _write_jsonl(args.val, val_records)
-
-    print(f"Train: {len(train_records)} records -> {args.train}")
-    print(f"Val: {len(val_records)} records -> {args.val}")
+    with args.input.open("rb") as src, \
+         args.train.open("wb", buffering=1 << 20) as train_f, \
+         args.val.open("wb", buffering=1 << 20) as val_f:
+        for idx, offset in enumerate(offsets):
+            src.seek(offset)
+            line = src.readline()
+            if not line.endswith(b"\n"):
+                line += b"\n"
+            (val_f if idx in val_indices else train_f).write(line)
+
+    train_count = len(offsets) - val_count
+    print(f"Train: {train_count} records -> {args.train}")
+    print(f"Val: {val_count} records -> {args.val}")
 
 
 if __name__ == "__main__":
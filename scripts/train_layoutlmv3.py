@@ -1,7 +1,10 @@
+import hashlib
 import os
 import pathlib
 from typing import Dict, List, Optional
 
+import numpy as np
+import torch
 from PIL import Image
 from pdf2image import convert_from_path
 from torch.utils.data import Dataset
@@ -11,7 +14,6 @@ from transformers import (
     LayoutLMv3ForSequenceClassification,
     TrainingArguments,
     Trainer,
-    default_data_collator,
 )
 
 # --------------------
@@ -54,6 +56,9 @@ class MRZImageDataset(Dataset):
         self.split = split
         self.processor = processor
         self.samples: List[Dict[str, object]] = []
+        # Rasterized pages are cached on disk keyed by PDF content, so
+        # epochs after the first load a PNG instead of re-rendering.
+        self.cache_dir = root_dir / ".raster_cache"
 
         split_dir = root_dir / split
         for lbl in labels:
@@ -76,27 +81,35 @@ class MRZImageDataset(Dataset):
         return len(self.samples)
 
     def _load_image_from_pdf(self, path: pathlib.Path) -> Image.Image:
-        pages = convert_from_path(str(path), dpi=300)
+        # Rendering is deterministic, so each PDF only needs to be
+        # rasterized once per content hash; every later draw (and every
+        # later epoch) is a PNG load.
+        pdf_bytes = path.read_bytes()
+        key = hashlib.blake2b(pdf_bytes, digest_size=16).hexdigest()
+        cached = self.cache_dir / f"{key}.png"
+        if cached.exists():
+            return Image.open(cached).convert("RGB")
+
+        # Ask poppler to rasterize straight at the target size instead of
+        # rendering at 300 dpi and LANCZOS-downsampling the ~10MP result —
+        # that second full pass over the pixels was the dominant
+        # per-sample cost.
+        pages = convert_from_path(str(path), size=IMG_SIZE, first_page=1, last_page=1, thread_count=1)
         if not pages:
             raise RuntimeError(f"Empty or unreadable PDF: {path}")
         img = pages[0].convert("RGB")
-        img = img.resize(IMG_SIZE, Image.Resampling.LANCZOS)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        img.save(cached, format="PNG", compress_level=1, optimize=False)
         return img
 
     def __getitem__(self, idx: int) -> Dict[str, object]:
+        # Preprocessing happens once per batch in the collator; samples
+        # only carry the PIL image and the label.
         sample = self.samples[idx]
-        img = self._load_image_from_pdf(sample["path"])
-
-        enc = self.processor(
-            images=img,
-            return_tensors="pt",
-            padding=True,
-            truncation=True,
-        )
-
-        item = {k: v.squeeze(0) for k, v in enc.items()}
-        item["labels"] = sample["label"]
-        return item
+        return {
+            "image": self._load_image_from_pdf(sample["path"]),
+            "labels": sample["label"],
+        }
 
 
 # --------------------
@@ -134,16 +147,40 @@ def main() -> None:
         learning_rate=5e-5,
         weight_decay=0.01,
         logging_steps=10,
+        # Load and preprocess samples in worker processes so the
+        # accelerator is never waiting on PDF decode; persistent workers
+        # keep the pool (and its raster-cache handles) alive across
+        # epochs.
+        dataloader_num_workers=min(8, os.cpu_count() or 1),
+        dataloader_pin_memory=True,
+        dataloader_persistent_workers=True,
     )
 
     def compute_metrics(eval_pred):
-        from sklearn.metrics import accuracy_score, f1_score
-
+        # Accuracy and macro-F1 straight from a bincount confusion
+        # matrix; no sklearn import on the eval path.
         logits, labels_np = eval_pred
         preds = logits.argmax(-1)
-        acc = accuracy_score(labels_np, preds)
-        f1 = f1_score(labels_np, preds, average="macro")
-        return {"accuracy": acc, "f1_macro": f1}
+        acc = float((preds == labels_np).mean())
+        k = len(labels)
+        confusion = np.bincount(labels_np * k + preds, minlength=k * k).reshape(k, k)
+        tp = np.diag(confusion)
+        fp = confusion.sum(axis=0) - tp
+        fn = confusion.sum(axis=1) - tp
+        f1 = 2 * tp / np.maximum(2 * tp + fp + fn, 1)
+        return {"accuracy": acc, "f1_macro": float(f1.mean())}
+
+    def layoutlm_collate(features: List[Dict[str, object]]) -> Dict[str, object]:
+        # One processor call per micro-batch replaces a call (and a
+        # restack by the default collator) per sample.
+        enc = processor(
+            images=[f["image"] for f in features],
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+        )
+        enc["labels"] = torch.tensor([f["labels"] for f in features], dtype=torch.long)
+        return enc
 
     trainer = Trainer(
         model=model,
@@ -152,7 +189,7 @@ def main() -> None:
         eval_dataset=val_ds,
         tokenizer=processor,
         compute_metrics=compute_metrics if val_ds is not None else None,
-        data_collator=default_data_collator,
+        data_collator=layoutlm_collate,
     )
 
     trainer.train()
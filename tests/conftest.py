@@ -0,0 +1,66 @@
+"""Shared test helpers."""
+
+import functools
+from pathlib import Path
+
+import pytest
+import yaml
+
+# LibYAML's C loader parses several times faster than the pure-Python
+# SafeLoader; fall back when PyYAML was built without it.
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+@functools.lru_cache(maxsize=16)
+def _load_yaml_cached(path_str: str, mtime_ns: int, size: int) -> object:
+    with open(path_str, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=_Loader)
+
+
+def load_yaml(path: Path) -> object:
+    """Parse a YAML file, reusing the result while the file is unchanged.
+
+    The cache key includes mtime and size so an edited file is re-read;
+    repeated loads of the same config across tests hit the cache.
+    """
+    stat = path.stat()
+    return _load_yaml_cached(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+# Stand-ins shared across test modules; session scope builds each one
+# once instead of redefining the same closure in every test body.
+
+
+@pytest.fixture
+def patch_attrs(monkeypatch):
+    """Apply several monkeypatch.setattr calls on one target in one go."""
+
+    def _apply(target, **attrs):
+        for name, value in attrs.items():
+            monkeypatch.setattr(target, name, value)
+
+    return _apply
+
+
+@pytest.fixture(scope="session")
+def fake_preprocess():
+    def _preprocess(_im):
+        return "preprocessed"
+
+    return _preprocess
+
+
+@pytest.fixture(scope="session")
+def fake_tokens_invoice():
+    def _tokens(_im, **_kwargs):
+        return "Invoice No: A12\nAccounting period: 01/2024", [{"text": "invoice"}]
+
+    return _tokens
+
+
+@pytest.fixture(scope="session")
+def make_fake_pages():
+    def _make(*specs):
+        return [type("P", (), dict(spec))() for spec in specs]
+
+    return _make
@@ -42,7 +42,7 @@ def test_build_jsonl_with_pdf(tmp_path: Path, monkeypatch):
             self.height = dummy_image.height
 
     monkeypatch.setattr(
-        build_jsonl, "load_images_from_bytes", lambda _b, dpi=300: [DummyPage(1), DummyPage(2)]
+        build_jsonl, "iter_images_from_path", lambda _p, dpi=300: iter([DummyPage(1), DummyPage(2)])
     )
 
     def fake_ocr_tokens(_image, *, lang, psm):
@@ -1,10 +1,11 @@
-import yaml
 from pathlib import Path
 
+from conftest import load_yaml
+
 
 def test_defaults_yaml_has_expected_keys():
     path = Path(__file__).resolve().parents[1] / "caesar_ocr" / "config" / "defaults.yaml"
-    data = yaml.safe_load(path.read_text())
+    data = load_yaml(path)
 
     assert "ocr" in data
     assert "layoutlm" in data
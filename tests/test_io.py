@@ -5,16 +5,29 @@ from pathlib import Path
 from PIL import Image
 
 from caesar_ocr.io.loaders import load_images_from_bytes
-from caesar_ocr.io.writers import write_csv, write_json, write_jsonl
+from caesar_ocr.io.writers import read_jsonl, write_csv, write_json, write_jsonl
 
 
-def _png_bytes(size=(10, 10), color=(255, 255, 255)) -> bytes:
+def _encode_png(size, color) -> bytes:
     image = Image.new("RGB", size, color)
     buf = io.BytesIO()
-    image.save(buf, format="PNG")
+    # compress_level=0 stores the PNG uncompressed; these bytes only need
+    # to be decodable, so the deflate pass is skipped.
+    image.save(buf, format="PNG", compress_level=0, optimize=False)
     return buf.getvalue()
 
 
+# Most tests use the default white 10x10 image; encode it once at import
+# instead of once per test.
+_DEFAULT_PNG = _encode_png((10, 10), (255, 255, 255))
+
+
+def _png_bytes(size=(10, 10), color=(255, 255, 255)) -> bytes:
+    if size == (10, 10) and color == (255, 255, 255):
+        return _DEFAULT_PNG
+    return _encode_png(size, color)
+
+
 def test_load_images_from_bytes_image():
     pages = load_images_from_bytes(_png_bytes())
     assert len(pages) == 1
@@ -36,6 +49,7 @@ def test_write_jsonl(tmp_path: Path):
     write_jsonl(path, rows)
     lines = [json.loads(line) for line in path.read_text().splitlines()]
     assert lines == rows
+    assert list(read_jsonl(path)) == rows
 
 
 def test_write_csv(tmp_path: Path):
@@ -1,55 +1,81 @@
 import types
 
+import pytest
+
 import caesar_ocr.layoutlm.infer as infer
 
 
-def test_analyze_bytes_layoutlm_mock(monkeypatch):
-    class DummyProcessor:
-        def __call__(self, images=None, return_tensors=None, lang=None):
-            class DummyTensor:
-                def to(self, _device):
-                    return self
+# Module-level dummies with __slots__: built once, no per-test class
+# creation, and attribute access resolves to fixed slot offsets.
+class _DummyTensor:
+    __slots__ = ()
+
+    def to(self, _device):
+        return self
+
+
+class _DummyProcessor:
+    __slots__ = ()
+
+    def __call__(self, images=None, return_tensors=None, lang=None):
+        return {"pixel_values": _DummyTensor()}
+
+
+class _DummyLogits:
+    __slots__ = ()
 
-            return {"pixel_values": DummyTensor()}
+    def squeeze(self, _dim):
+        return self
 
-    class DummyModel:
-        def __init__(self):
-            self.config = types.SimpleNamespace(id2label={0: "A", 1: "B"})
 
-        def eval(self):
-            return self
+class _DummyOutput:
+    __slots__ = ("logits",)
 
-        def to(self, _device):
-            return self
+    def __init__(self, logits):
+        self.logits = logits
 
-        def __call__(self, **_kwargs):
-            class DummyLogits:
-                def squeeze(self, _dim):
-                    return self
 
-            return types.SimpleNamespace(logits=DummyLogits())
+class _DummyModel:
+    __slots__ = ("config",)
 
-    def fake_softmax(_logits, dim=-1):
-        return types.SimpleNamespace(tolist=lambda: [0.2, 0.8])
+    def __init__(self):
+        self.config = types.SimpleNamespace(id2label={0: "A", 1: "B"})
 
-    def fake_argmax(_logits, dim=-1):
-        return types.SimpleNamespace(item=lambda: 1)
+    def eval(self):
+        return self
 
-    monkeypatch.setattr(infer, "AutoProcessor", types.SimpleNamespace(from_pretrained=lambda *a, **k: DummyProcessor()))
-    monkeypatch.setattr(infer, "AutoModelForSequenceClassification", types.SimpleNamespace(from_pretrained=lambda *a, **k: DummyModel()))
-    class DummyNoGrad:
-        def __enter__(self):
-            return None
+    def to(self, _device):
+        return self
 
-        def __exit__(self, exc_type, exc, tb):
-            return False
+    def __call__(self, **_kwargs):
+        return _DummyOutput(_DummyLogits())
 
-    monkeypatch.setattr(infer, "torch", types.SimpleNamespace(
-        softmax=lambda logits, dim=-1: fake_softmax(logits, dim),
-        argmax=lambda logits, dim=-1: fake_argmax(logits, dim),
-        no_grad=lambda: DummyNoGrad(),
+
+class _DummyNoGrad:
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+@pytest.fixture(scope="module")
+def dummy_torch():
+    return types.SimpleNamespace(
+        softmax=lambda logits, dim=-1: types.SimpleNamespace(tolist=lambda: [0.2, 0.8]),
+        argmax=lambda logits, dim=-1: types.SimpleNamespace(item=lambda: 1),
+        no_grad=lambda: _DummyNoGrad(),
+        inference_mode=lambda: _DummyNoGrad(),
         cuda=types.SimpleNamespace(is_available=lambda: False),
-    ))
+    )
+
+
+def test_analyze_bytes_layoutlm_mock(monkeypatch, dummy_torch):
+    monkeypatch.setattr(infer, "AutoProcessor", types.SimpleNamespace(from_pretrained=lambda *a, **k: _DummyProcessor()))
+    monkeypatch.setattr(infer, "AutoModelForSequenceClassification", types.SimpleNamespace(from_pretrained=lambda *a, **k: _DummyModel()))
+    monkeypatch.setattr(infer, "torch", dummy_torch)
     monkeypatch.setattr(infer, "load_images_from_bytes", lambda _b, dpi=300: [types.SimpleNamespace(image=object())])
 
     result = infer.analyze_bytes_layoutlm(b"dummy", model_dir="/tmp")
@@ -6,13 +6,26 @@ import caesar_ocr.ocr.engine as ocr
 from caesar_ocr.ocr.postprocess import normalize_text, normalize_tokens
 
 
-def _png_bytes(size=(10, 10), color=(255, 255, 255)) -> bytes:
+def _encode_png(size, color) -> bytes:
     image = Image.new("RGB", size, color)
     buf = io.BytesIO()
-    image.save(buf, format="PNG")
+    # compress_level=0 stores the PNG uncompressed; these bytes only need
+    # to be decodable, so the deflate pass is skipped.
+    image.save(buf, format="PNG", compress_level=0, optimize=False)
     return buf.getvalue()
 
 
+# Most tests use the default white 10x10 image; encode it once at import
+# instead of once per test.
+_DEFAULT_PNG = _encode_png((10, 10), (255, 255, 255))
+
+
+def _png_bytes(size=(10, 10), color=(255, 255, 255)) -> bytes:
+    if size == (10, 10) and color == (255, 255, 255):
+        return _DEFAULT_PNG
+    return _encode_png(size, color)
+
+
 def test_detect_mrz_lines():
     lines = ["hello", "P<UTOERIKSSON<<ANNA<MARIA<<<<<<<<<<<<<<<<<<<", "foo<<bar<<baz"]
     mrz = ocr.detect_mrz_lines(lines)
@@ -152,15 +165,12 @@ def test_extract_diploma_fields_german_line_with_name():
     assert fields.get("degree_type_guess") == "Diplom"
 
 
-def test_analyze_bytes_pdf(monkeypatch):
+def test_analyze_bytes_pdf(patch_attrs, fake_preprocess, make_fake_pages):
     dummy_image = Image.new("RGB", (10, 10), (255, 255, 255))
 
     def fake_load_images(_bytes, dpi=300):
         assert dpi == 300
-        return [type("P", (), {"image": dummy_image, "page": 1})()]
-
-    def fake_preprocess(_im):
-        return "preprocessed"
+        return make_fake_pages({"image": dummy_image, "page": 1})
 
     def fake_tokens(_im, **_kwargs):
         tokens = [
@@ -169,25 +179,20 @@ def test_analyze_bytes_pdf(monkeypatch):
         ]
         return "ignored", tokens
 
-    monkeypatch.setattr(ocr, "load_images_from_bytes", fake_load_images)
-    monkeypatch.setattr(ocr, "preprocess_image", fake_preprocess)
-    monkeypatch.setattr(ocr, "_ocr_tokens", fake_tokens)
+    patch_attrs(
+        ocr,
+        load_images_from_bytes=fake_load_images,
+        preprocess_image=fake_preprocess,
+        _ocr_tokens=fake_tokens,
+    )
 
     result = ocr.analyze_bytes(b"%PDF-1.4\n...")
     assert result.doc_type == "Passport"
     assert "passport_number" in result.fields
 
 
-def test_analyze_bytes_image(monkeypatch):
-    def fake_preprocess(_im):
-        return "preprocessed"
-
-    def fake_tokens(_im, **_kwargs):
-        tokens = [{"text": "invoice"}]
-        return "Invoice No: A12\nAccounting period: 01/2024", tokens
-
-    monkeypatch.setattr(ocr, "preprocess_image", fake_preprocess)
-    monkeypatch.setattr(ocr, "_ocr_tokens", fake_tokens)
+def test_analyze_bytes_image(patch_attrs, fake_preprocess, fake_tokens_invoice):
+    patch_attrs(ocr, preprocess_image=fake_preprocess, _ocr_tokens=fake_tokens_invoice)
 
     result = ocr.analyze_bytes(_png_bytes())
     assert result.doc_type == "Financial Report"
@@ -204,20 +209,16 @@ def test_normalize_tokens():
     assert [t["text"] for t in normalized] == ["hello", "world"]
 
 
-def test_analyze_bytes_passes_lang(monkeypatch):
+def test_analyze_bytes_passes_lang(patch_attrs, fake_preprocess):
     seen = {"pred": None, "text": None}
 
-    def fake_preprocess(_im):
-        return "preprocessed"
-
     def fake_tokens(_im, **_kwargs):
         seen["pred"] = _kwargs.get("lang")
         seen["text"] = _kwargs.get("lang")
         tokens = [{"text": "invoice"}]
         return "Invoice No: A12\nAccounting period: 01/2024", tokens
 
-    monkeypatch.setattr(ocr, "preprocess_image", fake_preprocess)
-    monkeypatch.setattr(ocr, "_ocr_tokens", fake_tokens)
+    patch_attrs(ocr, preprocess_image=fake_preprocess, _ocr_tokens=fake_tokens)
 
     _ = ocr.analyze_bytes(_png_bytes(), lang="deu")
     assert seen["pred"] == "deu"
@@ -1,10 +1,11 @@
 import json
 from pathlib import Path
 
+import caesar_ocr.pipeline.analyze as analyze_mod
 from caesar_ocr.pipeline.analyze import analyze_document_bytes
 
 
-def test_pipeline_schema_output(monkeypatch):
+def test_pipeline_schema_output(patch_attrs, make_fake_pages):
     def fake_analyze_bytes(_bytes, lang="eng+deu"):
         class Dummy:
             doc_type = "Financial Report"
@@ -26,10 +27,13 @@ def test_pipeline_schema_output(monkeypatch):
         return Dummy()
 
     def fake_load_images(_bytes, dpi=300):
-        return [type("P", (), {"page": 1, "width": 100, "height": 200, "image": object()})()]
+        return make_fake_pages({"page": 1, "width": 100, "height": 200, "image": object()})
 
-    monkeypatch.setattr("caesar_ocr.pipeline.analyze.analyze_pages", lambda _pages, lang="eng+deu": fake_analyze_bytes(None, lang=lang))
-    monkeypatch.setattr("caesar_ocr.pipeline.analyze.load_images_from_bytes", fake_load_images)
+    patch_attrs(
+        analyze_mod,
+        analyze_pages=lambda _pages, lang="eng+deu": fake_analyze_bytes(None, lang=lang),
+        load_images_from_bytes=fake_load_images,
+    )
 
     result = analyze_document_bytes(b"dummy")
     data = result.to_dict()
@@ -45,7 +49,7 @@ def test_pipeline_schema_output(monkeypatch):
     assert data["ocr"]["pages"][0]["tokens"][0]["conf"] == 0.9
 
 
-def test_pipeline_regex_rules(tmp_path: Path, monkeypatch):
+def test_pipeline_regex_rules(tmp_path: Path, patch_attrs, make_fake_pages):
     rules_path = tmp_path / "rules.yaml"
     rules_path.write_text(
         """
@@ -68,10 +72,13 @@ def test_pipeline_regex_rules(tmp_path: Path, monkeypatch):
         return Dummy()
 
     def fake_load_images(_bytes, dpi=300):
-        return [type("P", (), {"page": 1, "width": 100, "height": 200, "image": object()})()]
+        return make_fake_pages({"page": 1, "width": 100, "height": 200, "image": object()})
 
-    monkeypatch.setattr("caesar_ocr.pipeline.analyze.analyze_pages", lambda _pages, lang="eng+deu": fake_analyze_bytes(None, lang=lang))
-    monkeypatch.setattr("caesar_ocr.pipeline.analyze.load_images_from_bytes", fake_load_images)
+    patch_attrs(
+        analyze_mod,
+        analyze_pages=lambda _pages, lang="eng+deu": fake_analyze_bytes(None, lang=lang),
+        load_images_from_bytes=fake_load_images,
+    )
 
     result = analyze_document_bytes(b"dummy", regex_rules_path=str(rules_path))
     data = result.to_dict()
@@ -79,7 +86,7 @@ def test_pipeline_regex_rules(tmp_path: Path, monkeypatch):
     assert data["ocr"]["fields"]["invoice_number"] == "ABC-123"
 
 
-def test_pipeline_multi_page_tokens(monkeypatch):
+def test_pipeline_multi_page_tokens(patch_attrs, make_fake_pages):
     def fake_analyze_bytes(_bytes, lang="eng+deu"):
         class Dummy:
             doc_type = "unknown"
@@ -95,13 +102,16 @@ def test_pipeline_multi_page_tokens(monkeypatch):
         return Dummy()
 
     def fake_load_images(_bytes, dpi=300):
-        return [
-            type("P", (), {"page": 1, "width": 100, "height": 200, "image": object()})(),
-            type("P", (), {"page": 2, "width": 100, "height": 200, "image": object()})(),
-        ]
-
-    monkeypatch.setattr("caesar_ocr.pipeline.analyze.analyze_pages", lambda _pages, lang="eng+deu": fake_analyze_bytes(None, lang=lang))
-    monkeypatch.setattr("caesar_ocr.pipeline.analyze.load_images_from_bytes", fake_load_images)
+        return make_fake_pages(
+            {"page": 1, "width": 100, "height": 200, "image": object()},
+            {"page": 2, "width": 100, "height": 200, "image": object()},
+        )
+
+    patch_attrs(
+        analyze_mod,
+        analyze_pages=lambda _pages, lang="eng+deu": fake_analyze_bytes(None, lang=lang),
+        load_images_from_bytes=fake_load_images,
+    )
 
     result = analyze_document_bytes(b"dummy")
     data = result.to_dict()
@@ -3,7 +3,7 @@ import types
 import caesar_ocr.pipeline.analyze as analyze_mod
 
 
-def test_pipeline_layoutlm_token_inference(monkeypatch):
+def test_pipeline_layoutlm_token_inference(patch_attrs, make_fake_pages):
     def fake_analyze_bytes(_bytes, lang="eng+deu"):
         class Dummy:
             doc_type = "unknown"
@@ -19,23 +19,27 @@ def test_pipeline_layoutlm_token_inference(monkeypatch):
         return Dummy()
 
     def fake_load_images(_bytes, dpi=300):
-        return [
-            type("P", (), {"page": 1, "width": 100, "height": 200, "image": object()})(),
-            type("P", (), {"page": 2, "width": 100, "height": 200, "image": object()})(),
-        ]
+        return make_fake_pages(
+            {"page": 1, "width": 100, "height": 200, "image": object()},
+            {"page": 2, "width": 100, "height": 200, "image": object()},
+        )
 
     class FakeInferer:
         def __init__(self, model_dir):
             assert model_dir == "/tmp/model"
 
-        def infer(self, _image, tokens, bboxes):
-            if tokens == ["Hello", "World"]:
-                return ["B-TEST", "I-TEST"], [0.9, 0.8]
-            return [], []
+        def infer_batch(self, _images, tokens_list, bboxes_list):
+            return [
+                (["B-TEST", "I-TEST"], [0.9, 0.8]) if tokens == ["Hello", "World"] else ([], [])
+                for tokens in tokens_list
+            ]
 
-    monkeypatch.setattr(analyze_mod, "analyze_pages", lambda _pages, lang="eng+deu": fake_analyze_bytes(None, lang=lang))
-    monkeypatch.setattr(analyze_mod, "load_images_from_bytes", fake_load_images)
-    monkeypatch.setattr(analyze_mod, "TokenInferer", type("T", (), {"from_model_dir": staticmethod(lambda d: FakeInferer(d))}))
+    patch_attrs(
+        analyze_mod,
+        analyze_pages=lambda _pages, lang="eng+deu": fake_analyze_bytes(None, lang=lang),
+        load_images_from_bytes=fake_load_images,
+        TokenInferer=type("T", (), {"from_model_dir": staticmethod(lambda d: FakeInferer(d))}),
+    )
 
     result = analyze_mod.analyze_document_bytes(b"dummy", layoutlm_token_model_dir="/tmp/model")
     data = result.to_dict()
@@ -94,6 +94,66 @@ def test_run_rules_with_validator(tmp_path: Path):
     assert out["__debug__"][-1]["valid"] is True
 
 
+def test_run_rules_shadowed_overlap_keeps_first_occurrence(tmp_path: Path):
+    rules_path = tmp_path / "rules.yaml"
+    rules_path.write_text(
+        """
+- name: a
+  pattern: 'invoice\\s+\\d+'
+  output_field: a
+- name: b
+  pattern: '\\d{3}'
+  output_field: b
+"""
+    )
+    rules = load_rules(rules_path)
+    # Rule a consumes "invoice 123" in the combined pass, shadowing b's
+    # first occurrence; b must still report 123, not the later 456.
+    out = run_rules("invoice 123 and later 456", rules)
+    assert out["a"] == "invoice 123"
+    assert out["b"] == "123"
+
+
+def test_run_rules_flags_consistent_across_match_paths(tmp_path: Path):
+    rules_path = tmp_path / "rules.yaml"
+    rules_path.write_text(
+        """
+- name: a
+  pattern: 'foo\\d'
+  output_field: a
+  flags: I
+- name: b
+  pattern: 'bar\\d'
+  output_field: b
+  flags: I
+"""
+    )
+    rules = load_rules(rules_path)
+    # a owns the overall first combined hit; b goes through the
+    # individual re-search path. Both must honor the I flag.
+    out = run_rules("FOO1 xx BAR2", rules)
+    assert out["a"] == "FOO1"
+    assert out["b"] == "BAR2"
+
+    # Lowercase flag letters are ignored by _parse_flags; the combined
+    # pass must agree and stay case-sensitive on both paths.
+    rules_path_lower = tmp_path / "rules_lower.yaml"
+    rules_path_lower.write_text(
+        """
+- name: a
+  pattern: 'foo\\d'
+  output_field: a
+  flags: i
+- name: b
+  pattern: 'bar\\d'
+  output_field: b
+  flags: i
+"""
+    )
+    rules = load_rules(rules_path_lower)
+    assert run_rules("FOO1 xx BAR2", rules) == {}
+
+
 def test_run_rules_confidence_and_debug(tmp_path: Path):
     rules_path = tmp_path / "rules.yaml"
     rules_path.write_text(